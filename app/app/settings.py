@@ -20,6 +20,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "core",
     "rest_framework",
     "drf_spectacular",
@@ -72,6 +73,15 @@ DATABASES = {
 }
 
 
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ.get("REDIS_URL"),
+        }
+    }
+
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -101,6 +111,22 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
 STATIC_URL = "static/"
 
+# Where partially uploaded submission files are kept until finalized.
+SUBMISSION_UPLOAD_DIR = os.environ.get("SUBMISSION_UPLOAD_DIR", BASE_DIR / "uploads")
+
+SUBMISSION_UPLOAD_MAX_SIZE = 2 * 1024 * 1024 * 1024
+
+# Hand file downloads to the front proxy: "x-accel-redirect", "x-sendfile"
+# or None to stream them from Django.
+FILE_DOWNLOAD_OFFLOAD = os.environ.get("FILE_DOWNLOAD_OFFLOAD")
+
+# Internal nginx location that maps to the media storage.
+FILE_DOWNLOAD_ACCEL_PREFIX = "/protected/"
+
+# Reject classes and enrollments overlapping other classes of the teacher or
+# students instead of only reporting the conflicts.
+CLASSROOM_REJECT_CONFLICTS = False
+
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -109,7 +135,7 @@ AUTH_USER_MODEL = "core.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.roles.ProfileJWTAuthentication",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
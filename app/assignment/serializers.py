@@ -1,5 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
-from core.models import Assignment, Submission, Grade
+from core.enrollment import is_enrolled
+from core.models import Assignment, Submission, SubmissionUpload, Grade
+from core.roles import STUDENT, TEACHER, request_role
 from rest_framework.exceptions import PermissionDenied
 
 
@@ -12,8 +15,8 @@ class AssignmentSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         # Ensure only teachers can create assignments
-        request = self.context.get("request")
-        if not hasattr(request.user, "teacher"):
+        role, _ = request_role(self.context["request"])
+        if role != TEACHER:
             raise serializers.ValidationError(
                 "You must be a teacher to create an assignment."
             )
@@ -32,7 +35,7 @@ class SubmissionSerializer(serializers.ModelSerializer):
         assignment = data["assignment"]
         student = data["student"]
 
-        if not assignment.class_assigned.students.filter(id=student.id).exists():
+        if not is_enrolled(student.id, assignment.class_assigned_id):
             raise PermissionDenied(
                 "You are not enrolled in the class for this assignment."
             )
@@ -41,12 +44,64 @@ class SubmissionSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         # Ensure only students can create submissions
-        request = self.context.get("request")
-        if not hasattr(request.user, "student"):
+        role, _ = request_role(self.context["request"])
+        if role != STUDENT:
             raise PermissionDenied("You must be a student to submit an assignment.")
         return super().create(validated_data)
 
 
+class InboxSubmissionSerializer(serializers.ModelSerializer):
+    """Serializer for submissions in the grading inbox."""
+
+    assignment_title = serializers.CharField(source="assignment.title")
+    due_date = serializers.DateField(source="assignment.due_date")
+    first_name = serializers.CharField(source="student.user.first_name")
+    last_name = serializers.CharField(source="student.user.last_name")
+
+    class Meta:
+        model = Submission
+        fields = [
+            "id",
+            "assignment",
+            "assignment_title",
+            "due_date",
+            "student",
+            "first_name",
+            "last_name",
+            "submitted_date",
+            "file",
+        ]
+        read_only_fields = fields
+
+
+class SubmissionUploadSerializer(serializers.ModelSerializer):
+    """Serializer for resumable submission upload sessions."""
+
+    class Meta:
+        model = SubmissionUpload
+        fields = ["id", "assignment", "filename", "size", "offset", "created_at"]
+        read_only_fields = ["id", "offset", "created_at"]
+
+    def validate_size(self, value):
+        if value > settings.SUBMISSION_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"File size cannot exceed {settings.SUBMISSION_UPLOAD_MAX_SIZE} bytes."
+            )
+        return value
+
+    def validate(self, data):
+        # Ensure student is enrolled in the class of the assignment
+        role, profile = request_role(self.context["request"])
+        assignment = data["assignment"]
+
+        if role != STUDENT or not is_enrolled(profile.id, assignment.class_assigned_id):
+            raise PermissionDenied(
+                "You are not enrolled in the class for this assignment."
+            )
+
+        return data
+
+
 class GradeSerializer(serializers.ModelSerializer):
     """Serializer for grade objects."""
 
@@ -56,7 +111,14 @@ class GradeSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         # Ensure only teachers can create grades
-        request = self.context.get("request")
-        if not hasattr(request.user, "teacher"):
+        role, _ = request_role(self.context["request"])
+        if role != TEACHER:
             raise PermissionDenied("You must be a teacher to create a grade.")
         return super().create(validated_data)
+
+
+class BulkGradeSerializer(serializers.Serializer):
+    """Serializer for one item of a bulk grading request."""
+
+    submission = serializers.IntegerField()
+    grade = serializers.FloatField()
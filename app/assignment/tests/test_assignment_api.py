@@ -1,20 +1,79 @@
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core import signing
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
+import io
+import os
 import tempfile
+import zipfile
+from unittest import mock
+from datetime import timedelta
 
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
 from django.core.files.uploadedfile import SimpleUploadedFile
 
-from core.models import Class, Assignment, Submission, Grade, Teacher, Student, Course
-
+from core.models import (
+    Class,
+    Assignment,
+    Submission,
+    SubmissionUpload,
+    Grade,
+    Teacher,
+    Student,
+    Course,
+    Tombstone,
+)
+from assignment import views
+from assignment.views import AssignmentViewSet, SubmissionUploadViewSet, SyncView
+from core.events import InProcessBroker, student_channel
+from core.stats import STATS_CACHE_TIMEOUT, stats_cache_key
+from core.sync import SYNC_TOKEN_SALT
+from core.upcoming import invalidate_upcoming_for_students
 
 User = get_user_model()
 
 ASSIGNMENTS_URL = reverse("assignment:assignment-list")
 SUBMISSIONS_URL = reverse("assignment:submission-list")
 GRADES_URL = reverse("assignment:grade-list")
+UPCOMING_URL = reverse("assignment:assignment-upcoming")
+INBOX_URL = reverse("assignment:submission-inbox")
+BULK_GRADES_URL = reverse("assignment:grade-bulk")
+IMPORT_GRADES_URL = reverse("assignment:grade-import")
+UPLOADS_URL = reverse("assignment:submission-upload-list")
+SYNC_URL = reverse("assignment:sync")
+EVENTS_URL = reverse("assignment:events")
+
+
+def stats_url(assignment_id):
+    """Create and return an assignment statistics URL."""
+    return reverse("assignment:assignment-stats", args=[assignment_id])
+
+
+def submissions_zip_url(assignment_id):
+    """Create and return an assignment submissions archive URL."""
+    return reverse("assignment:assignment-submissions-zip", args=[assignment_id])
+
+
+def download_url(submission_id):
+    """Create and return a submission download URL."""
+    return reverse("assignment:submission-download", args=[submission_id])
+
+
+def upload_url(upload_id):
+    """Create and return an upload session URL."""
+    return reverse("assignment:submission-upload-detail", args=[upload_id])
+
+
+def finalize_url(upload_id):
+    """Create and return an upload session finalize URL."""
+    return reverse("assignment:submission-upload-finalize", args=[upload_id])
 
 
 def create_user(**params):
@@ -106,6 +165,7 @@ class TeacherAssignmentAPITests(TestCase):
     """Test authenticated Teacher API requests for assignments."""
 
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = create_user()
         self.teacher = create_teacher(user=self.user)
@@ -141,6 +201,239 @@ class TeacherAssignmentAPITests(TestCase):
         res = self.client.post(ASSIGNMENTS_URL, payload, format="json")
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_download_submissions_zip(self):
+        """Test teacher can download all submissions of an assignment as a ZIP."""
+        assignment = create_assignment(class_assigned=self.classroom)
+        student = create_student(
+            user=create_user(
+                email="student@example.com", first_name="Ada", last_name="Lovelace"
+            )
+        )
+        submission = create_submission(assignment=assignment, student=student)
+
+        self.assertTrue(submissions_zip_url(assignment.id).endswith(".zip"))
+        res = self.client.get(submissions_zip_url(assignment.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/zip")
+        archive = zipfile.ZipFile(io.BytesIO(b"".join(res.streaming_content)))
+        name = f"Lovelace_Ada_{student.id}/{submission.id}_" + os.path.basename(
+            submission.file.name
+        )
+        self.assertEqual(archive.namelist(), [name])
+        self.assertEqual(archive.read(name), b"file content")
+
+    async def test_download_submissions_zip_through_asgi(self):
+        """Test the ZIP archive is streamed chunk by chunk through ASGI."""
+        assignment = await sync_to_async(create_assignment)(
+            class_assigned=self.classroom
+        )
+        user = await sync_to_async(create_user)(
+            email="student@example.com", first_name="Ada", last_name="Lovelace"
+        )
+        student = await sync_to_async(create_student)(user=user)
+        submission = await sync_to_async(create_submission)(
+            assignment=assignment, student=student
+        )
+        token = await sync_to_async(AccessToken.for_user)(self.user)
+
+        res = await self.async_client.get(
+            submissions_zip_url(assignment.id), AUTHORIZATION=f"Bearer {token}"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.is_async)
+        content = b"".join([chunk async for chunk in res.streaming_content])
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        name = f"Lovelace_Ada_{student.id}/{submission.id}_" + os.path.basename(
+            submission.file.name
+        )
+        self.assertEqual(archive.namelist(), [name])
+        self.assertEqual(archive.read(name), b"file content")
+
+    def test_download_submissions_zip_other_class_denied(self):
+        """Test teacher cannot download submissions for other classes."""
+        other_teacher = create_teacher(user=create_user(email="other@example.com"))
+        other_class = create_class(teacher=other_teacher, course_id=self.course)
+        assignment = create_assignment(class_assigned=other_class)
+
+        res = self.client.get(submissions_zip_url(assignment.id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_assignment_grade_stats(self):
+        """Test teacher can retrieve grade statistics of an assignment."""
+        assignment = create_assignment(class_assigned=self.classroom)
+        for i, grade in enumerate([55.0, 70.0, 85.0, 100.0]):
+            student = create_student(user=create_user(email=f"s{i}@example.com"))
+            create_grade(create_submission(assignment, student), grade=grade)
+
+        res = self.client.get(stats_url(assignment.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 4)
+        self.assertEqual(res.data["mean"], 77.5)
+        self.assertEqual(res.data["median"], 77.5)
+        self.assertEqual(res.data["min"], 55.0)
+        self.assertEqual(res.data["max"], 100.0)
+        self.assertAlmostEqual(res.data["std_dev"], 16.770509831)
+        self.assertEqual(res.data["percentiles"]["25"], 66.25)
+        self.assertEqual(
+            [bucket["count"] for bucket in res.data["histogram"]],
+            [0, 0, 0, 0, 0, 1, 0, 1, 1, 1],
+        )
+
+    def test_assignment_grade_stats_invalidated_on_grade_change(self):
+        """Test cached statistics are dropped when a grade changes."""
+        assignment = create_assignment(class_assigned=self.classroom)
+        student = create_student(user=create_user(email="student@example.com"))
+        grade = create_grade(create_submission(assignment, student), grade=60.0)
+        self.assertEqual(self.client.get(stats_url(assignment.id)).data["mean"], 60.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            grade.grade = 80.0
+            grade.save()
+
+        self.assertEqual(self.client.get(stats_url(assignment.id)).data["mean"], 80.0)
+
+    def test_assignment_grade_stats_cached_with_timeout(self):
+        """Test statistics are cached for a finite time."""
+        assignment = create_assignment(class_assigned=self.classroom)
+
+        with mock.patch("core.stats.cache") as stats_cache:
+            stats_cache.get.return_value = None
+            self.client.get(stats_url(assignment.id))
+
+        stats_cache.set.assert_called_once_with(
+            stats_cache_key(assignment.id), mock.ANY, STATS_CACHE_TIMEOUT
+        )
+
+    def test_list_assignments_paginated_by_cursor(self):
+        """Test assignments are listed in pages linked by cursors."""
+        assignments = [
+            create_assignment(class_assigned=self.classroom) for _ in range(3)
+        ]
+
+        res = self.client.get(ASSIGNMENTS_URL, {"page_size": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]],
+            [assignments[2].id, assignments[1].id],
+        )
+        self.assertIsNone(res.data["previous"])
+
+        res = self.client.get(res.data["next"])
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], [assignments[0].id]
+        )
+        self.assertIsNone(res.data["next"])
+
+    def test_list_assignments_page_size_capped(self):
+        """Test requested page size cannot exceed the maximum."""
+        pagination = AssignmentViewSet.pagination_class()
+        request = APIRequestFactory().get(ASSIGNMENTS_URL, {"page_size": 100000})
+
+        page_size = pagination.get_page_size(Request(request))
+
+        self.assertEqual(page_size, pagination.max_page_size)
+
+
+class StudentUpcomingAssignmentsAPITests(TestCase):
+    """Test the upcoming assignments feed of students."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.student = create_student(user=create_user(email="student@example.com"))
+        self.teacher = create_teacher(user=create_user(email="teacher@example.com"))
+        self.course = create_course(author=self.teacher)
+        self.classroom = create_class(teacher=self.teacher, course_id=self.course)
+        self.classroom.students.add(self.student)
+        self.today = timezone.localdate()
+        self.client.force_authenticate(self.student.user)
+
+    def test_upcoming_assignments(self):
+        """Test only enrolled classes' assignments due in the window are listed."""
+        soon = create_assignment(
+            class_assigned=self.classroom, due_date=self.today + timedelta(days=3)
+        )
+        create_assignment(
+            class_assigned=self.classroom, due_date=self.today + timedelta(days=30)
+        )
+        create_assignment(
+            class_assigned=self.classroom, due_date=self.today - timedelta(days=1)
+        )
+        other_class = create_class(teacher=self.teacher, course_id=self.course)
+        create_assignment(class_assigned=other_class, due_date=self.today)
+
+        res = self.client.get(UPCOMING_URL, {"days": 7})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in res.data], [soon.id])
+
+    def test_upcoming_assignments_cache_invalidated(self):
+        """Test the cached feed is refreshed when an assignment is created."""
+        self.assertEqual(self.client.get(UPCOMING_URL).data, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            assignment = create_assignment(
+                class_assigned=self.classroom, due_date=self.today
+            )
+
+        res = self.client.get(UPCOMING_URL)
+        self.assertEqual([item["id"] for item in res.data], [assignment.id])
+
+    def test_upcoming_assignments_cache_invalidated_on_class_delete(self):
+        """Test the cached feed is refreshed when the class is deleted."""
+        create_assignment(class_assigned=self.classroom, due_date=self.today)
+        self.assertEqual(len(self.client.get(UPCOMING_URL).data), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classroom.delete()
+
+        self.assertEqual(self.client.get(UPCOMING_URL).data, [])
+
+    def test_upcoming_windows_cached_separately(self):
+        """Test caching one window keeps the other windows of the day."""
+        assignment = create_assignment(
+            class_assigned=self.classroom, due_date=self.today + timedelta(days=3)
+        )
+        self.client.get(UPCOMING_URL, {"days": 7})
+        self.client.get(UPCOMING_URL, {"days": 1})
+
+        with self.assertNumQueries(0):
+            res = self.client.get(UPCOMING_URL, {"days": 7})
+
+        self.assertEqual([item["id"] for item in res.data], [assignment.id])
+
+    def test_upcoming_invalidated_while_computed_not_cached(self):
+        """Test a feed computed while the cache is invalidated is not reused."""
+        enrolled_class_ids = views.enrolled_class_ids
+
+        def invalidate_during_query(student_id):
+            invalidate_upcoming_for_students([student_id])
+            return enrolled_class_ids(student_id)
+
+        with mock.patch(
+            "assignment.views.enrolled_class_ids", side_effect=invalidate_during_query
+        ):
+            self.assertEqual(self.client.get(UPCOMING_URL).data, [])
+        assignment = create_assignment(
+            class_assigned=self.classroom, due_date=self.today
+        )
+
+        res = self.client.get(UPCOMING_URL)
+        self.assertEqual([item["id"] for item in res.data], [assignment.id])
+
+    def test_upcoming_assignments_invalid_days(self):
+        """Test the window must be a bounded number of days."""
+        res = self.client.get(UPCOMING_URL, {"days": 1000})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class StudentSubmissionAPITests(TestCase):
     """Test authenticated Student API requests for submissions."""
@@ -211,6 +504,202 @@ class StudentSubmissionAPITests(TestCase):
             self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class SubmissionDownloadAPITests(TestCase):
+    """Test downloading submission files."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.student = create_student(user=create_user(email="student@example.com"))
+        self.teacher = create_teacher(user=create_user(email="teacher@example.com"))
+        self.course = create_course(author=self.teacher)
+        self.classroom = create_class(teacher=self.teacher, course_id=self.course)
+        self.assignment = create_assignment(class_assigned=self.classroom)
+        self.submission = create_submission(
+            assignment=self.assignment, student=self.student
+        )
+        self.client.force_authenticate(self.student.user)
+
+    def test_download_submission_file(self):
+        """Test student can download their submitted file."""
+        res = self.client.get(download_url(self.submission.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(res.streaming_content), b"file content")
+        self.assertIn("ETag", res)
+        self.assertIn("attachment", res["Content-Disposition"])
+
+    async def test_download_submission_file_through_asgi(self):
+        """Test the file is streamed chunk by chunk through ASGI."""
+        token = await sync_to_async(AccessToken.for_user)(self.student.user)
+
+        res = await self.async_client.get(
+            download_url(self.submission.id), AUTHORIZATION=f"Bearer {token}"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.is_async)
+        self.assertEqual(res["Content-Length"], "12")
+        content = b"".join([chunk async for chunk in res.streaming_content])
+        self.assertEqual(content, b"file content")
+
+    def test_download_not_modified(self):
+        """Test a matching If-None-Match returns 304."""
+        etag = self.client.get(download_url(self.submission.id))["ETag"]
+
+        res = self.client.get(download_url(self.submission.id), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_download_range(self):
+        """Test a byte range of the file can be requested."""
+        res = self.client.get(download_url(self.submission.id), HTTP_RANGE="bytes=5-")
+
+        self.assertEqual(res.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(b"".join(res.streaming_content), b"content")
+        self.assertEqual(res["Content-Range"], "bytes 5-11/12")
+
+    def test_download_range_not_satisfiable(self):
+        """Test a range past the end of the file returns 416."""
+        res = self.client.get(download_url(self.submission.id), HTTP_RANGE="bytes=50-")
+
+        self.assertEqual(
+            res.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+
+    @override_settings(FILE_DOWNLOAD_OFFLOAD="x-accel-redirect")
+    def test_download_offloaded_to_proxy(self):
+        """Test the transfer is handed to the proxy when configured."""
+        res = self.client.get(download_url(self.submission.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res["X-Accel-Redirect"], "/protected/" + self.submission.file.name
+        )
+        self.assertEqual(res.content, b"")
+
+    def test_download_other_students_submission_denied(self):
+        """Test student cannot download another student's file."""
+        other = create_student(user=create_user(email="other@example.com"))
+        self.client.force_authenticate(other.user)
+
+        res = self.client.get(download_url(self.submission.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class StudentSubmissionUploadAPITests(TestCase):
+    """Test resumable submission uploads."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.student = create_student(user=create_user(email="student@example.com"))
+        self.teacher = create_teacher(user=create_user(email="teacher@example.com"))
+        self.course = create_course(author=self.teacher)
+        self.classroom = create_class(teacher=self.teacher, course_id=self.course)
+        self.classroom.students.add(self.student)
+        self.assignment = create_assignment(class_assigned=self.classroom)
+        self.client.force_authenticate(self.student.user)
+
+        upload_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(upload_dir.cleanup)
+        settings_override = override_settings(SUBMISSION_UPLOAD_DIR=upload_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def put_chunk(self, upload_id, data, start, size):
+        """Send a chunk of the file and return the response."""
+        return self.client.put(
+            upload_url(upload_id),
+            data,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{start + len(data) - 1}/{size}",
+        )
+
+    def test_chunked_upload_creates_submission(self):
+        """Test uploading a file in chunks and finalizing it into a submission."""
+        content = b"first chunk|second chunk"
+        payload = {
+            "assignment": self.assignment.id,
+            "filename": "project.zip",
+            "size": len(content),
+        }
+        res = self.client.post(UPLOADS_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        upload_id = res.data["id"]
+
+        res = self.put_chunk(upload_id, content[:12], 0, len(content))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["offset"], 12)
+
+        res = self.client.get(upload_url(upload_id))
+        self.assertEqual(res.data["offset"], 12)
+
+        res = self.put_chunk(upload_id, content[12:], 12, len(content))
+        self.assertEqual(res.data["offset"], len(content))
+
+        res = self.client.post(finalize_url(upload_id))
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        submission = Submission.objects.get(id=res.data["id"])
+        self.assertEqual(submission.student, self.student)
+        with submission.file.open("rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertFalse(SubmissionUpload.objects.exists())
+
+    def test_chunk_at_wrong_offset_rejected(self):
+        """Test a chunk not starting at the current offset is rejected."""
+        upload = SubmissionUpload.objects.create(
+            assignment=self.assignment, student=self.student, filename="a.txt", size=10
+        )
+        open(upload.path, "wb").close()
+
+        res = self.put_chunk(upload.id, b"12345", 5, 10)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["offset"], 0)
+
+    def test_stale_chunk_does_not_overwrite(self):
+        """Test a chunk for a range stored meanwhile leaves the file intact."""
+        upload = SubmissionUpload.objects.create(
+            assignment=self.assignment, student=self.student, filename="a.txt", size=10
+        )
+        with open(upload.path, "wb") as partial:
+            partial.write(b"12345")
+        stale = SubmissionUpload.objects.get(id=upload.id)
+        SubmissionUpload.objects.filter(id=upload.id).update(offset=5)
+
+        # The request read the session before the other request stored it.
+        with mock.patch.object(
+            SubmissionUploadViewSet, "get_object", return_value=stale
+        ):
+            res = self.put_chunk(upload.id, b"abcde", 0, 10)
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data["offset"], 5)
+        with open(upload.path, "rb") as partial:
+            self.assertEqual(partial.read(), b"12345")
+
+    def test_finalize_incomplete_upload_rejected(self):
+        """Test an upload cannot be finalized before all bytes arrive."""
+        upload = SubmissionUpload.objects.create(
+            assignment=self.assignment, student=self.student, filename="a.txt", size=10
+        )
+
+        res = self.client.post(finalize_url(upload.id))
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Submission.objects.exists())
+
+    def test_upload_not_enrolled(self):
+        """Test student cannot start an upload for a class they are not in."""
+        self.classroom.students.remove(self.student)
+        payload = {"assignment": self.assignment.id, "filename": "a.txt", "size": 10}
+
+        res = self.client.post(UPLOADS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
 class TeacherGradeAPITests(TestCase):
     """Test authenticated Teacher API requests for grades."""
 
@@ -247,7 +736,7 @@ class TeacherGradeAPITests(TestCase):
         res = self.client.get(GRADES_URL)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         # Ensure the grade belongs to the logged-in student
-        for grade in res.data:
+        for grade in res.data["results"]:
             self.assertEqual(grade["submission"]["student"], self.student.id)
 
     def test_teacher_can_grade_own_assignments(self):
@@ -266,3 +755,373 @@ class TeacherGradeAPITests(TestCase):
         payload = {"submission": self.submission.id, "grade": 80.0}
         res = self.client.post(GRADES_URL, payload, format="json")
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_bulk_grade_submissions(self):
+        """Test teacher can create and update many grades in one request."""
+        other_student = create_student(user=create_user(email="other@example.com"))
+        other_submission = create_submission(
+            assignment=self.assignment, student=other_student
+        )
+        create_grade(submission=other_submission, grade=50.0)
+        foreign_teacher = create_teacher(user=create_user(email="foreign@example.com"))
+        foreign_class = create_class(teacher=foreign_teacher, course_id=self.course)
+        foreign_submission = create_submission(
+            assignment=create_assignment(class_assigned=foreign_class),
+            student=self.student,
+        )
+        self.client.force_authenticate(self.teacher.user)
+        payload = [
+            {"submission": self.submission.id, "grade": 90.0},
+            {"submission": other_submission.id, "grade": 70.0},
+            {"submission": foreign_submission.id, "grade": 100.0},
+            {"submission": self.submission.id},
+        ]
+
+        res = self.client.post(BULK_GRADES_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["graded"], 2)
+        self.assertEqual([error["index"] for error in res.data["errors"]], [2, 3])
+        self.assertEqual(Grade.objects.get(submission=self.submission).grade, 90.0)
+        self.assertEqual(Grade.objects.get(submission=other_submission).grade, 70.0)
+        self.assertFalse(Grade.objects.filter(submission=foreign_submission).exists())
+
+    def test_student_cannot_bulk_grade(self):
+        """Test students cannot use the bulk grading endpoint."""
+        payload = [{"submission": self.submission.id, "grade": 90.0}]
+
+        res = self.client.post(BULK_GRADES_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Grade.objects.exists())
+
+    def test_import_grades_csv(self):
+        """Test teacher can import grades from a CSV file."""
+        other_student = create_student(user=create_user(email="other@example.com"))
+        other_submission = create_submission(
+            assignment=self.assignment, student=other_student
+        )
+        create_grade(submission=other_submission, grade=50.0)
+        latest_submission = create_submission(
+            assignment=self.assignment, student=other_student
+        )
+        self.client.force_authenticate(self.teacher.user)
+        content = (
+            "submission,assignment,student,grade\n"
+            f"{self.submission.id},,,90\n"
+            f",{self.assignment.id},other@example.com,70.5\n"
+            f",{self.assignment.id},missing@example.com,60\n"
+            f"{self.submission.id},,,not a number\n"
+        )
+        file = SimpleUploadedFile("grades.csv", content.encode(), "text/csv")
+
+        res = self.client.post(IMPORT_GRADES_URL, {"file": file}, format="multipart")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["graded"], 2)
+        self.assertEqual([error["row"] for error in res.data["errors"]], [4, 5])
+        self.assertEqual(Grade.objects.get(submission=self.submission).grade, 90.0)
+        self.assertEqual(Grade.objects.get(submission=latest_submission).grade, 70.5)
+        self.assertEqual(Grade.objects.get(submission=other_submission).grade, 50.0)
+
+    def test_import_grades_csv_invalid_header(self):
+        """Test a CSV without the expected columns is rejected."""
+        self.client.force_authenticate(self.teacher.user)
+        file = SimpleUploadedFile("grades.csv", b"name,score\nA,1\n", "text/csv")
+
+        res = self.client.post(IMPORT_GRADES_URL, {"file": file}, format="multipart")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_grading_inbox_lists_ungraded_submissions(self):
+        """Test teacher inbox lists ungraded submissions of their classes."""
+        other_student = create_student(user=create_user(email="other@example.com"))
+        ungraded = create_submission(assignment=self.assignment, student=other_student)
+        create_grade(submission=self.submission)
+        foreign_teacher = create_teacher(user=create_user(email="foreign@example.com"))
+        create_submission(
+            assignment=create_assignment(
+                class_assigned=create_class(
+                    teacher=foreign_teacher, course_id=self.course
+                )
+            ),
+            student=self.student,
+        )
+        self.client.force_authenticate(self.teacher.user)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(INBOX_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["id"] for item in res.data["results"]], [ungraded.id])
+        self.assertEqual(res.data["results"][0]["assignment_title"], "Homework 1")
+
+    def test_grading_inbox_updated_when_graded(self):
+        """Test graded submissions leave the inbox and return when ungraded."""
+        self.client.force_authenticate(self.teacher.user)
+        grade = create_grade(submission=self.submission)
+
+        res = self.client.get(INBOX_URL)
+        self.assertEqual(res.data["results"], [])
+
+        grade.delete()
+
+        res = self.client.get(INBOX_URL)
+        self.assertEqual(
+            [item["id"] for item in res.data["results"]], [self.submission.id]
+        )
+
+
+class SyncAPITests(TestCase):
+    """Test the delta sync endpoint."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = create_teacher(user=create_user(email="teacher@example.com"))
+        self.student = create_student(user=create_user(email="student@example.com"))
+        course = create_course(author=self.teacher)
+        self.classroom = create_class(teacher=self.teacher, course_id=course)
+        self.classroom.students.add(self.student)
+        self.assignment = create_assignment(class_assigned=self.classroom)
+        self.submission = create_submission(self.assignment, self.student)
+        self.grade = create_grade(self.submission)
+
+    def age(self):
+        """Move every row's modification time out of the sync window."""
+        past = timezone.now() - timedelta(hours=1)
+        for model in (Assignment, Submission, Grade):
+            model.objects.update(modified=past)
+        for model in (Teacher, Student):
+            model.objects.update(sync_reset=past)
+
+    def login(self, user):
+        """Authenticate with a token so every request loads a fresh profile."""
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}"
+        )
+
+    def sync(self, token):
+        """Return the response of a delta sync from the given token."""
+        return self.client.get(SYNC_URL, {"since": token})
+
+    def test_full_sync(self):
+        """Test a sync without token returns every visible row."""
+        other = create_student(user=create_user(email="other@example.com"))
+        create_submission(self.assignment, other)
+        self.client.force_authenticate(self.student.user)
+
+        res = self.client.get(SYNC_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [a["id"] for a in res.data["assignments"]], [self.assignment.id]
+        )
+        self.assertEqual(
+            [s["id"] for s in res.data["submissions"]], [self.submission.id]
+        )
+        self.assertEqual([g["id"] for g in res.data["grades"]], [self.grade.id])
+        self.assertTrue(res.data["token"])
+
+    def test_delta_sync(self):
+        """Test a sync with a token returns only changes and deletions."""
+        self.client.force_authenticate(self.teacher.user)
+        self.age()
+        token = self.client.get(SYNC_URL).data["token"]
+
+        self.grade.grade = 80.0
+        self.grade.save()
+        submission_id = self.submission.id
+        self.submission.delete()
+        res = self.client.get(SYNC_URL, {"since": token})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["assignments"], [])
+        self.assertEqual(res.data["submissions"], [])
+        self.assertEqual(
+            res.data["deleted"],
+            {
+                "assignments": [],
+                "submissions": [submission_id],
+                "grades": [self.grade.id],
+            },
+        )
+
+    def test_delta_sync_unchanged(self):
+        """Test nothing is returned when nothing changed."""
+        self.client.force_authenticate(self.student.user)
+        self.age()
+        token = self.client.get(SYNC_URL).data["token"]
+
+        res = self.client.get(SYNC_URL, {"since": token})
+
+        self.assertEqual(res.data["assignments"], [])
+        self.assertEqual(res.data["submissions"], [])
+        self.assertEqual(res.data["grades"], [])
+
+    def test_enrolled_student_gets_full_sync(self):
+        """Test enrolling resyncs the existing assignments of the class."""
+        other = create_student(user=create_user(email="other@example.com"))
+        self.login(other.user)
+        self.age()
+        token = self.client.get(SYNC_URL).data["token"]
+
+        self.classroom.students.add(other)
+        res = self.sync(token)
+
+        self.assertTrue(res.data["full"])
+        self.assertEqual(
+            [a["id"] for a in res.data["assignments"]], [self.assignment.id]
+        )
+
+    def test_unenrolled_student_gets_full_sync(self):
+        """Test unenrolling resyncs so the class's assignments are dropped."""
+        self.login(self.student.user)
+        self.age()
+        token = self.client.get(SYNC_URL).data["token"]
+
+        self.classroom.students.remove(self.student)
+        res = self.sync(token)
+
+        self.assertTrue(res.data["full"])
+        self.assertEqual(res.data["assignments"], [])
+
+    def test_moved_assignment_resyncs_previous_class(self):
+        """Test moving an assignment resyncs the students who lose it."""
+        other_teacher = create_teacher(user=create_user(email="t2@example.com"))
+        other_class = create_class(
+            teacher=other_teacher, course_id=self.classroom.course
+        )
+        self.login(self.student.user)
+        self.age()
+        token = self.client.get(SYNC_URL).data["token"]
+
+        self.assignment.class_assigned = other_class
+        self.assignment.save()
+
+        res = self.sync(token)
+        self.assertTrue(res.data["full"])
+        self.assertEqual(res.data["assignments"], [])
+        self.teacher.refresh_from_db()
+        other_teacher.refresh_from_db()
+        self.assertGreater(self.teacher.sync_reset, timezone.now() - timedelta(1))
+        self.assertGreater(other_teacher.sync_reset, timezone.now() - timedelta(1))
+
+    def test_deleted_class_tombstones_visible_to_teacher(self):
+        """Test the teacher of a deleted class gets its tombstones."""
+        self.client.force_authenticate(self.teacher.user)
+        self.age()
+        token = self.client.get(SYNC_URL).data["token"]
+
+        self.classroom.delete()
+        res = self.sync(token)
+
+        self.assertFalse(res.data["full"])
+        self.assertEqual(
+            res.data["deleted"],
+            {
+                "assignments": [self.assignment.id],
+                "submissions": [self.submission.id],
+                "grades": [self.grade.id],
+            },
+        )
+
+    def test_expired_token_gets_full_sync(self):
+        """Test a token older than the tombstones gets a full sync."""
+        self.client.force_authenticate(self.student.user)
+        self.age()
+        moment = timezone.now() - timedelta(days=365)
+        token = signing.dumps(moment.isoformat(), salt=SYNC_TOKEN_SALT)
+
+        res = self.sync(token)
+
+        self.assertTrue(res.data["full"])
+        self.assertEqual(
+            [a["id"] for a in res.data["assignments"]], [self.assignment.id]
+        )
+
+    def test_full_sync_paginated(self):
+        """Test the rows of a sync are paged with a cursor."""
+        second = create_assignment(class_assigned=self.classroom)
+        self.client.force_authenticate(self.teacher.user)
+
+        with mock.patch.object(SyncView, "page_size", 1):
+            first_page = self.client.get(SYNC_URL)
+            last_page = self.client.get(SYNC_URL, {"cursor": first_page.data["next"]})
+
+        self.assertEqual(
+            [a["id"] for a in first_page.data["assignments"]], [self.assignment.id]
+        )
+        self.assertEqual([a["id"] for a in last_page.data["assignments"]], [second.id])
+        self.assertEqual(last_page.data["submissions"], [])
+        self.assertIsNone(last_page.data["next"])
+        self.assertEqual(last_page.data["token"], first_page.data["token"])
+
+    def test_prune_tombstones(self):
+        """Test the command deletes tombstones older than the retention."""
+        self.submission.delete()
+        Tombstone.objects.filter(model=Tombstone.GRADE).update(
+            deleted=timezone.now() - timedelta(days=365)
+        )
+        stdout = io.StringIO()
+
+        call_command("prune_tombstones", stdout=stdout)
+
+        self.assertIn("Deleted 1 tombstones.", stdout.getvalue())
+        self.assertEqual(
+            list(Tombstone.objects.values_list("model", flat=True)),
+            [Tombstone.SUBMISSION],
+        )
+
+    def test_invalid_token(self):
+        """Test a tampered token is rejected."""
+        self.client.force_authenticate(self.student.user)
+
+        res = self.client.get(SYNC_URL, {"since": "invalid"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class EventStreamAPITests(TestCase):
+    """Test the server-sent event stream."""
+
+    def setUp(self):
+        self.student = create_student(user=create_user(email="student@example.com"))
+        self.teacher = create_teacher(user=create_user(email="teacher@example.com"))
+
+    async def test_stream_events(self):
+        """Test published events of the student are streamed."""
+        token = str(AccessToken.for_user(self.student.user))
+        # The Postgres broker only delivers committed NOTIFYs, which a test
+        # transaction never sends, so fan out within the process.
+        broker = InProcessBroker()
+
+        with mock.patch("assignment.views.get_broker", return_value=broker):
+            res = await self.async_client.get(EVENTS_URL, {"token": token})
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res["Content-Type"], "text/event-stream")
+            stream = aiter(res.streaming_content)
+            self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+
+        broker.publish(
+            [(student_channel(self.student.id), {"type": "grade", "grade": 90.0})]
+        )
+
+        self.assertEqual(
+            await anext(stream),
+            b'event: grade\ndata: {"type": "grade", "grade": 90.0}\n\n',
+        )
+        await stream.aclose()
+
+    async def test_stream_requires_auth(self):
+        """Test anonymous clients cannot subscribe."""
+        res = await self.async_client.get(EVENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_stream_students_only(self):
+        """Test teachers cannot subscribe."""
+        token = str(AccessToken.for_user(self.teacher.user))
+
+        res = await self.async_client.get(EVENTS_URL, {"token": token})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -14,10 +14,22 @@ from assignment import views
 router = DefaultRouter()
 router.register("assignment", views.AssignmentViewSet, basename="assignment")
 router.register("submission", views.SubmissionViewSet, basename="submission")
+router.register(
+    "submission-upload",
+    views.SubmissionUploadViewSet,
+    basename="submission-upload",
+)
 router.register("grade", views.GradeViewSet, basename="grade")
 
 app_name = "assignment"
 
 urlpatterns = [
+    path("sync/", views.SyncView.as_view(), name="sync"),
+    path("events/", views.event_stream, name="events"),
+    path(
+        "assignment/<int:pk>/submissions.zip",
+        views.AssignmentViewSet.as_view({"get": "submissions_zip"}),
+        name="assignment-submissions-zip",
+    ),
     path("", include(router.urls)),
 ]
@@ -2,29 +2,89 @@
 Views for managing Assignments, Submissions and Grades.
 """
 
+import asyncio
+import codecs
+import csv
+import json
+import os
+import re
+from datetime import datetime, timedelta
+
 from rest_framework.permissions import IsAuthenticated
-from rest_framework import viewsets
+from rest_framework import mixins, status, viewsets
+from rest_framework.views import APIView
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.core.exceptions import PermissionDenied
-from core.models import Assignment, Submission, Grade, Class
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from django.core.files import File
+from django.db import transaction
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.db.models import Q
+from django.utils.text import get_valid_filename
+from core.downloads import iter_zip, serve_file, streaming_content
+from core.enrollment import enrolled_class_ids
+from core.events import class_channel, get_broker, student_channel
+from core.grading import (
+    NOT_OWNED_ERROR,
+    import_grades,
+    owned_submissions,
+    save_grades,
+)
+from core.models import (
+    Assignment,
+    Submission,
+    SubmissionUpload,
+    Grade,
+    Class,
+    Tombstone,
+)
+from core.pagination import InboxPagination, KeysetPagination
+from core.roles import (
+    STUDENT,
+    TEACHER,
+    ProfileJWTAuthentication,
+    RoleMixin,
+    resolve_role,
+)
+from core.stats import assignment_grade_stats
+from core.sync import (
+    is_sync_token_current,
+    make_sync_cursor,
+    make_sync_token,
+    read_sync_cursor,
+    read_sync_token,
+)
+from core.upcoming import get_cached_feed, set_cached_feed
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework_simplejwt.exceptions import InvalidToken
 
 from assignment import serializers
 
+UPCOMING_DEFAULT_DAYS = 14
+
+UPCOMING_MAX_DAYS = 90
+
+EVENT_STREAM_KEEPALIVE = 15
+
 
-class AssignmentViewSet(viewsets.ModelViewSet):
+class AssignmentViewSet(RoleMixin, viewsets.ModelViewSet):
     """View for managing assignment API."""
 
     serializer_class = serializers.AssignmentSerializer
     queryset = Assignment.objects.all()
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ProfileJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def perform_create(self, serializer):
         """Ensure only teachers can create assignments and validate class ownership."""
-        user = self.request.user
-
         # Ensure the user is a teacher
-        if not hasattr(user, "teacher"):
+        if self.request.role != TEACHER:
             raise PermissionDenied("You must be a teacher to create an assignment.")
 
         # Extract class_assigned from the request data
@@ -37,7 +97,7 @@ class AssignmentViewSet(viewsets.ModelViewSet):
                 raise PermissionDenied("The class does not exist.")
 
             # Check if the teacher is associated with the class
-            if assigned_class.teacher != user.teacher:
+            if assigned_class.teacher_id != self.request.profile.id:
                 raise PermissionDenied(
                     "You are not authorized to create assignments for this class."
                 )
@@ -45,28 +105,126 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         # Save the assignment
         serializer.save()
 
+    def is_class_teacher(self, assignment):
+        """Return whether the user teaches the class of the assignment."""
+        if self.request.role != TEACHER:
+            return False
+        return assignment.class_assigned.teacher_id == self.request.profile.id
+
+    @action(detail=False, methods=["get"])
+    def upcoming(self, request):
+        """
+        List the assignments due soon in the classes the student is enrolled in.
+
+        `?days=<n>` sets the window starting today. The feed is cached per
+        student until an assignment of one of their classes or their
+        enrollments change.
+        """
+        if request.role != STUDENT:
+            raise PermissionDenied("Only students have upcoming assignments.")
+        student = request.profile
+
+        days = request.query_params.get("days", UPCOMING_DEFAULT_DAYS)
+        try:
+            days = int(days)
+        except (TypeError, ValueError):
+            raise ValidationError({"days": "A valid integer is required."})
+        if not 0 <= days <= UPCOMING_MAX_DAYS:
+            raise ValidationError(
+                {"days": f"Must be between 0 and {UPCOMING_MAX_DAYS}."}
+            )
+
+        today = timezone.localdate()
+        version, feed = get_cached_feed(student.id, today, days)
+        if feed is None:
+            assignments = Assignment.objects.filter(
+                class_assigned_id__in=enrolled_class_ids(student.id),
+                due_date__range=(today, today + timedelta(days=days)),
+            ).order_by("due_date", "id")
+            feed = self.get_serializer(assignments, many=True).data
+            set_cached_feed(version, today, days, feed)
+        return Response(feed)
+
+    def submissions_zip(self, request, pk=None):
+        """
+        Stream a ZIP archive of all submissions for the assignment.
+
+        Routed in `assignment.urls` so the file name ends the URL.
+        """
+        assignment = self.get_object()
+
+        if not self.is_class_teacher(assignment):
+            raise PermissionDenied(
+                "You can only download submissions for your own classes."
+            )
+
+        submissions = (
+            Submission.objects.filter(assignment=assignment)
+            .select_related("student__user")
+            .only(
+                "id",
+                "file",
+                "student__id",
+                "student__user__first_name",
+                "student__user__last_name",
+            )
+            .order_by("student__user__last_name", "student__user__first_name", "id")
+        )
+        entries = (
+            (
+                "{}/{}_{}".format(
+                    get_valid_filename(
+                        f"{submission.student.user.last_name}_"
+                        f"{submission.student.user.first_name}_{submission.student.id}"
+                    ),
+                    submission.id,
+                    os.path.basename(submission.file.name),
+                ),
+                submission.file,
+            )
+            for submission in submissions.iterator(chunk_size=500)
+        )
+
+        response = StreamingHttpResponse(
+            streaming_content(request, iter_zip(entries)),
+            content_type="application/zip",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="assignment-{assignment.id}-submissions.zip"'
+        )
+        return response
+
+    @action(detail=True, methods=["get"])
+    def stats(self, request, pk=None):
+        """Return grade statistics of the assignment."""
+        assignment = self.get_object()
 
-class SubmissionViewSet(viewsets.ModelViewSet):
+        if not self.is_class_teacher(assignment):
+            raise PermissionDenied("You can only view statistics for your own classes.")
+
+        return Response(assignment_grade_stats(assignment.id))
+
+
+class SubmissionViewSet(RoleMixin, viewsets.ModelViewSet):
     """View for managing submission API."""
 
     serializer_class = serializers.SubmissionSerializer
     queryset = Submission.objects.all()
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ProfileJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Allow students to view only their own submissions, and teachers to view submissions for their own classes."""
-        user = self.request.user
-
-        if hasattr(user, "student"):
+        if self.request.role == STUDENT:
             # Students can only view their own submissions
-            return Submission.objects.filter(student=user.student)
+            return Submission.objects.filter(student=self.request.profile)
 
-        if hasattr(user, "teacher"):
+        if self.request.role == TEACHER:
             # Teachers can view submissions related to assignments in their classes
-            teacher_classes = Class.objects.filter(teacher=user.teacher)
-            assignments = Assignment.objects.filter(class_assigned__in=teacher_classes)
-            return Submission.objects.filter(assignment__in=assignments)
+            return Submission.objects.filter(
+                assignment__class_assigned__teacher=self.request.profile
+            )
 
         # Raise an error if the user is neither a student nor a teacher
         raise PermissionDenied("Invalid user type")
@@ -74,64 +232,477 @@ class SubmissionViewSet(viewsets.ModelViewSet):
     def get_object(self):
         """Retrieve an object and ensure students can only access their own submissions."""
         obj = super().get_object()
-        user = self.request.user
-        if hasattr(user, "student") and obj.student != user.student:
+        if self.request.role == STUDENT and obj.student_id != self.request.profile.id:
             raise PermissionDenied(
                 "You do not have permission to access this submission."
             )
         return obj
 
+    @action(
+        detail=False,
+        methods=["get"],
+        pagination_class=InboxPagination,
+        serializer_class=serializers.InboxSubmissionSerializer,
+    )
+    def inbox(self, request):
+        """List the ungraded submissions of the teacher's classes, oldest first."""
+        if request.role != TEACHER:
+            raise PermissionDenied("Only teachers have a grading inbox.")
+
+        submissions = Submission.objects.filter(
+            assignment__class_assigned__teacher=request.profile,
+            is_graded=False,
+        ).select_related("assignment", "student__user")
+
+        page = self.paginate_queryset(submissions)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        """Download the submitted file."""
+        submission = self.get_object()
+        return serve_file(request, submission.file)
+
     def perform_create(self, serializer):
         """Ensure only students can create submissions."""
-        if not hasattr(self.request.user, "student"):
+        if self.request.role != STUDENT:
             raise PermissionDenied("You must be a student to submit an assignment.")
         serializer.save()
 
 
-class GradeViewSet(viewsets.ModelViewSet):
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+UPLOAD_READ_SIZE = 64 * 1024
+
+
+class SubmissionUploadViewSet(
+    RoleMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    View for resumable submission uploads.
+
+    A student creates an upload session, sends the file in byte ranges with
+    `PUT` and a `Content-Range` header, and finalizes the session into a
+    submission once all bytes are received. Each chunk is streamed to disk
+    as it is read, so a request only holds a worker for one chunk and an
+    interrupted transfer resumes from the last stored offset.
+    """
+
+    serializer_class = serializers.SubmissionUploadSerializer
+    queryset = SubmissionUpload.objects.all()
+    authentication_classes = [ProfileJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Allow students to access only their own uploads."""
+        if self.request.role != STUDENT:
+            raise PermissionDenied("You must be a student to upload a submission.")
+        return self.queryset.filter(student=self.request.profile)
+
+    def perform_create(self, serializer):
+        """Create the upload session and its empty partial file."""
+        upload = serializer.save(student=self.request.profile)
+        os.makedirs(settings.SUBMISSION_UPLOAD_DIR, exist_ok=True)
+        open(upload.path, "wb").close()
+
+    def perform_destroy(self, instance):
+        """Abort the upload and discard the received bytes."""
+        path = instance.path
+        instance.delete()
+        if os.path.exists(path):
+            os.remove(path)
+
+    def update(self, request, *args, **kwargs):
+        """Store the byte range given by the Content-Range header."""
+        upload = self.get_object()
+
+        match = CONTENT_RANGE_RE.match(request.headers.get("Content-Range", ""))
+        if not match:
+            return Response(
+                {"error": "A 'Content-Range: bytes <start>-<end>/<size>' header is required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        start, end, size = (int(value) for value in match.groups())
+
+        if size != upload.size or start > end or end >= upload.size:
+            return Response(
+                {"error": "Content-Range does not match the upload size."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Lock the session so a retried or concurrent request for the same
+        # range waits, then sees the advanced offset instead of rewriting it.
+        with transaction.atomic():
+            upload = SubmissionUpload.objects.select_for_update().get(id=upload.id)
+            if start != upload.offset:
+                return Response(
+                    {"error": "Chunk must start at the current offset.", "offset": upload.offset},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+            # Stream the request body straight to the partial file.
+            length = end - start + 1
+            received = 0
+            with open(upload.path, "r+b") as partial:
+                partial.seek(start)
+                partial.truncate()
+                while received < length:
+                    chunk = request.read(min(UPLOAD_READ_SIZE, length - received))
+                    if not chunk:
+                        break
+                    partial.write(chunk)
+                    received += len(chunk)
+
+            upload.offset = start + received
+            upload.save(update_fields=["offset"])
+
+        return Response(self.get_serializer(upload).data)
+
+    @action(detail=True, methods=["post"])
+    def finalize(self, request, pk=None):
+        """Turn a completed upload into a submission."""
+        upload = self.get_object()
+
+        if upload.offset != upload.size:
+            return Response(
+                {"error": "Upload is incomplete.", "offset": upload.offset},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        path = upload.path
+        with transaction.atomic():
+            submission = Submission(assignment=upload.assignment, student=upload.student)
+            with open(path, "rb") as partial:
+                submission.file.save(upload.filename, File(partial), save=False)
+            submission.save()
+            upload.delete()
+        os.remove(path)
+
+        serializer = serializers.SubmissionSerializer(
+            submission, context=self.get_serializer_context()
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class GradeViewSet(RoleMixin, viewsets.ModelViewSet):
     """View for managing grade API."""
 
     serializer_class = serializers.GradeSerializer
     queryset = Grade.objects.all()
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ProfileJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Allow teachers to view all grades and students to view only their own."""
-        if hasattr(self.request.user, "teacher"):
+        if self.request.role == TEACHER:
             # Teachers can view all grades
             return Grade.objects.all()
-        elif hasattr(self.request.user, "student"):
+        elif self.request.role == STUDENT:
             # Students can view only their own grades
-            return Grade.objects.filter(submission__student=self.request.user.student)
+            return Grade.objects.filter(submission__student=self.request.profile)
         raise PermissionDenied("Invalid user type")
 
     def perform_create(self, serializer):
         """Ensure only teachers can create grades and only for their own assignments."""
-        if hasattr(self.request.user, "student"):
+        if self.request.role == STUDENT:
             raise PermissionDenied("Students cannot assign grades.")
 
-        if not hasattr(self.request.user, "teacher"):
+        if self.request.role != TEACHER:
             raise PermissionDenied("Only teachers can assign grades.")
 
         submission = serializer.validated_data["submission"]
         assignment = submission.assignment
-        teacher = self.request.user.teacher
 
         # Check if the assignment's class belongs to the teacher
-        if assignment.class_assigned.teacher != teacher:
+        if assignment.class_assigned.teacher_id != self.request.profile.id:
             raise PermissionDenied("You can only grade assignments you created.")
 
         serializer.save()
 
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Create or update grades for many submissions at once.
+
+        Ownership of all submissions is checked with one query and the
+        valid grades are upserted with a single statement. Invalid items
+        are reported by their index in the request.
+        """
+        if request.role != TEACHER:
+            raise PermissionDenied("Only teachers can assign grades.")
+
+        if not isinstance(request.data, list):
+            return Response(
+                {"error": "Expected a list of {submission, grade} items."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        errors = []
+        items = []
+        for index, item in enumerate(request.data):
+            serializer = serializers.BulkGradeSerializer(data=item)
+            if serializer.is_valid():
+                items.append((index, serializer.validated_data))
+            else:
+                errors.append({"index": index, "errors": serializer.errors})
+
+        owned = owned_submissions(
+            request.profile,
+            Q(id__in=[data["submission"] for _, data in items]),
+        )
+
+        grades = {}
+        for index, data in items:
+            if data["submission"] not in owned:
+                errors.append(
+                    {
+                        "index": index,
+                        "errors": {"submission": [NOT_OWNED_ERROR]},
+                    }
+                )
+                continue
+            # The last grade sent for a submission wins.
+            grades[data["submission"]] = data["grade"]
+
+        save_grades(grades, owned)
+
+        errors.sort(key=lambda error: error["index"])
+        return Response({"graded": len(grades), "errors": errors})
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        url_name="import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_csv(self, request):
+        """
+        Import grades from an uploaded CSV `file`.
+
+        The file is read row by row and saved in batches, see
+        `core.grading.import_grades` for the expected columns. Invalid rows
+        are reported by their line number.
+        """
+        if request.role != TEACHER:
+            raise PermissionDenied("Only teachers can assign grades.")
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "This field is required."})
+
+        try:
+            graded, errors = import_grades(
+                request.profile, codecs.iterdecode(upload, "utf-8-sig")
+            )
+        except (UnicodeDecodeError, csv.Error, ValueError) as error:
+            raise ValidationError({"file": str(error)})
+        return Response({"graded": graded, "errors": errors})
+
     def update(self, request, *args, **kwargs):
         """Prevent students from updating grades."""
-        if not hasattr(self.request.user, "teacher"):
+        if self.request.role != TEACHER:
             raise PermissionDenied("Only teachers can update grades.")
         return super().update(request, *args, **kwargs)
 
     def partial_update(self, request, *args, **kwargs):
         """Prevent students from updating grades."""
-        if not hasattr(self.request.user, "teacher"):
+        if self.request.role != TEACHER:
             raise PermissionDenied("Only teachers can update grades.")
         return super().partial_update(request, *args, **kwargs)
+
+
+class SyncView(RoleMixin, APIView):
+    """
+    Return the assignments, submissions and grades changed since a sync token.
+
+    Without `?since=<token>` every visible row is returned. Each response
+    carries the token for the next sync and the ids of rows deleted since
+    the given token, so steady state refreshes only move the changes. A
+    token that can no longer describe the changes, because it is older
+    than the tombstones or the user's visible rows changed, gets a full
+    sync flagged `full`. Rows come in pages of at most `page_size` per type,
+    followed with `?cursor=<next>` until `next` is null.
+    """
+
+    authentication_classes = [ProfileJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    page_size = 500
+
+    def get(self, request):
+        profile = request.profile
+        if request.query_params.get("cursor"):
+            try:
+                state = read_sync_cursor(request.query_params["cursor"])
+            except ValueError:
+                raise ValidationError({"cursor": "Invalid sync cursor."})
+        else:
+            since = None
+            if request.query_params.get("since"):
+                try:
+                    since = read_sync_token(request.query_params["since"])
+                except ValueError:
+                    raise ValidationError({"since": "Invalid sync token."})
+                if not is_sync_token_current(since, profile):
+                    since = None
+
+            state = {
+                # Taken before reading so rows changed meanwhile are sent next time.
+                "token": make_sync_token(),
+                "since": since.isoformat() if since else None,
+                "after": {"assignments": 0, "submissions": 0, "grades": 0},
+                "first": True,
+            }
+        since = None
+        if state["since"]:
+            since = datetime.fromisoformat(state["since"])
+
+        if request.role == TEACHER:
+            assignments = Assignment.objects.filter(class_assigned__teacher=profile)
+            submissions = Submission.objects.filter(
+                assignment__class_assigned__teacher=profile
+            )
+            grades = Grade.objects.filter(
+                submission__assignment__class_assigned__teacher=profile
+            )
+            # Kept by teacher so tombstones of deleted classes stay visible.
+            tombstones = Tombstone.objects.filter(teacher_id=profile.id)
+        elif request.role == STUDENT:
+            class_ids = enrolled_class_ids(profile.id)
+            assignments = Assignment.objects.filter(class_assigned_id__in=class_ids)
+            submissions = Submission.objects.filter(student=profile)
+            grades = Grade.objects.filter(submission__student=profile)
+            # Losing a class resets the sync, see core.signals.
+            enrolled = Q(
+                model=Tombstone.ASSIGNMENT,
+                class_id__in=class_ids,
+            )
+            tombstones = Tombstone.objects.filter(enrolled | Q(student_id=profile.id))
+        else:
+            raise PermissionDenied("Invalid user type")
+
+        deleted = {"assignments": [], "submissions": [], "grades": []}
+        if since is not None:
+            assignments = assignments.filter(modified__gte=since)
+            submissions = submissions.filter(modified__gte=since)
+            grades = grades.filter(modified__gte=since)
+            if state["first"]:
+                keys = {
+                    Tombstone.ASSIGNMENT: "assignments",
+                    Tombstone.SUBMISSION: "submissions",
+                    Tombstone.GRADE: "grades",
+                }
+                for model, object_id in tombstones.filter(
+                    deleted__gte=since
+                ).values_list("model", "object_id"):
+                    deleted[keys[model]].append(object_id)
+
+        pages = {}
+        has_next = False
+        for key, queryset in (
+            ("assignments", assignments),
+            ("submissions", submissions),
+            ("grades", grades),
+        ):
+            rows = queryset.filter(id__gt=state["after"][key]).order_by("id")
+            rows = list(rows[: self.page_size + 1])
+            if len(rows) > self.page_size:
+                rows = rows[: self.page_size]
+                has_next = True
+            if rows:
+                state["after"][key] = rows[-1].id
+            pages[key] = rows
+
+        next_cursor = None
+        if has_next:
+            next_cursor = make_sync_cursor({**state, "first": False})
+
+        context = {"request": request}
+        return Response(
+            {
+                "token": state["token"],
+                "full": since is None,
+                "next": next_cursor,
+                "assignments": serializers.AssignmentSerializer(
+                    pages["assignments"], many=True, context=context
+                ).data,
+                "submissions": serializers.SubmissionSerializer(
+                    pages["submissions"], many=True, context=context
+                ).data,
+                "grades": serializers.GradeSerializer(
+                    pages["grades"], many=True, context=context
+                ).data,
+                "deleted": deleted,
+            }
+        )
+
+
+def event_stream_user(request):
+    """
+    Authenticate a JWT from the Authorization header or the `token` query
+    parameter, EventSource clients cannot set headers.
+    """
+    authentication = ProfileJWTAuthentication()
+    try:
+        if request.GET.get("token"):
+            token = authentication.get_validated_token(request.GET["token"])
+            return authentication.get_user(token)
+        result = authentication.authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    return result[0] if result else None
+
+
+def event_stream_channels(user):
+    """Return the event channels of a student, None for other users."""
+    role, student = resolve_role(user)
+    if role != STUDENT:
+        return None
+    class_ids = enrolled_class_ids(student.id)
+    return [student_channel(student.id)] + [
+        class_channel(class_id) for class_id in class_ids
+    ]
+
+
+def format_event(event):
+    data = json.dumps(event, cls=DjangoJSONEncoder)
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+
+async def event_stream(request):
+    """
+    Stream server-sent events of the student's new grades and the new
+    assignments of their classes.
+
+    Serve the project through ASGI so open streams do not hold a worker.
+    """
+    user = await sync_to_async(event_stream_user)(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."}, status=401
+        )
+    channels = await sync_to_async(event_stream_channels)(user)
+    if channels is None:
+        return JsonResponse({"detail": "Only students can subscribe."}, status=403)
+
+    async def events():
+        with get_broker().subscribe(channels) as subscription:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await subscription.get(EVENT_STREAM_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_event(event)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -3,7 +3,9 @@ Serializer for classroom API.
 """
 
 from rest_framework import serializers
-from core.models import Class, Course, Teacher, Student
+from core.models import Class, Course, GradebookEntry, Teacher, Student
+
+ENROLLMENT_MAX_STUDENTS = 10000
 
 
 class ClassroomSerializer(serializers.ModelSerializer):
@@ -14,17 +16,111 @@ class ClassroomSerializer(serializers.ModelSerializer):
         queryset=Teacher.objects.all(), required=False
     )
     students = serializers.PrimaryKeyRelatedField(
-        queryset=Student.objects.all(), many=True, required=False
+        queryset=Student.objects.all(), many=True, required=False, write_only=True
     )
+    student_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Class
-        fields = ["id", "course", "teacher", "students", "start_date", "end_date"]
+        fields = [
+            "id",
+            "course",
+            "teacher",
+            "students",
+            "student_count",
+            "start_date",
+            "end_date",
+        ]
         read_only_fields = ["id", "teacher"]
 
+    def validate(self, data):
+        start_date = data.get("start_date", getattr(self.instance, "start_date", None))
+        end_date = data.get("end_date", getattr(self.instance, "end_date", None))
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError(
+                {"end_date": "End date cannot be before the start date."}
+            )
+        return data
+
     def create(self, validated_data):
         """Override to assign teacher automatically during classroom creation."""
         students = validated_data.pop("students", [])
         classroom = Class.objects.create(**validated_data)
         classroom.students.set(students)
+        classroom.student_count = len(students)
+        return classroom
+
+    def update(self, instance, validated_data):
+        classroom = super().update(instance, validated_data)
+        if "students" in validated_data:
+            classroom.student_count = len(validated_data["students"])
         return classroom
+
+
+class ClassroomCloneSerializer(serializers.Serializer):
+    """Serializer for the options of a classroom clone."""
+
+    start_date = serializers.DateField()
+    end_date = serializers.DateField(required=False)
+    copy_students = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if "end_date" in data and data["end_date"] < data["start_date"]:
+            raise serializers.ValidationError(
+                {"end_date": "End date cannot be before the start date."}
+            )
+        return data
+
+
+class RosterStudentSerializer(serializers.ModelSerializer):
+    """Serializer for the students of a class roster."""
+
+    email = serializers.EmailField(source="user.email")
+    first_name = serializers.CharField(source="user.first_name")
+    last_name = serializers.CharField(source="user.last_name")
+
+    class Meta:
+        model = Student
+        fields = ["id", "email", "first_name", "last_name"]
+
+
+class EnrollmentSerializer(serializers.Serializer):
+    """Serializer for the student ids of an enrollment change."""
+
+    students = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=ENROLLMENT_MAX_STUDENTS,
+    )
+
+    def validate_students(self, value):
+        """Check all students exist with one query."""
+        student_ids = set(value)
+        existing = set(
+            Student.objects.filter(id__in=student_ids).values_list("id", flat=True)
+        )
+        missing = sorted(student_ids - existing)
+        if missing:
+            raise serializers.ValidationError(
+                f"Invalid pk {missing} - objects do not exist."
+            )
+        return student_ids
+
+
+class GradebookEntrySerializer(serializers.ModelSerializer):
+    """Serializer for gradebook rows."""
+
+    first_name = serializers.CharField(source="student.user.first_name")
+    last_name = serializers.CharField(source="student.user.last_name")
+
+    class Meta:
+        model = GradebookEntry
+        fields = [
+            "student",
+            "first_name",
+            "last_name",
+            "scores",
+            "submitted_count",
+            "graded_count",
+            "average",
+        ]
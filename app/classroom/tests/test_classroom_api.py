@@ -1,14 +1,77 @@
+import csv
+import zipfile
+from io import BytesIO, StringIO
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.urls import reverse
 
-from core.models import Class, Course, Teacher, Student
+from core.models import (
+    Assignment,
+    Class,
+    Course,
+    GradebookEntry,
+    Grade,
+    Submission,
+    Teacher,
+    Student,
+)
 from classroom.serializers import ClassroomSerializer
+from classroom.views import ClassroomViewSet
 
 CLASSROOM_URL = reverse("classroom:classroom-list")
 
+ACTIVE_URL = reverse("classroom:classroom-active")
+
+
+def gradebook_url(classroom_id):
+    """Create and return a classroom gradebook URL."""
+    return reverse("classroom:classroom-gradebook", args=[classroom_id])
+
+
+def gradebook_export_url(classroom_id, export_format):
+    """Create and return a classroom gradebook export URL."""
+    return reverse(
+        "classroom:classroom-gradebook-export",
+        kwargs={"pk": classroom_id, "export_format": export_format},
+    )
+
+
+def detail_url(classroom_id):
+    """Create and return a classroom detail URL."""
+    return reverse("classroom:classroom-detail", args=[classroom_id])
+
+
+def clone_url(classroom_id):
+    """Create and return a classroom clone URL."""
+    return reverse("classroom:classroom-clone", args=[classroom_id])
+
+
+def roster_url(classroom_id):
+    """Create and return a classroom roster URL."""
+    return reverse("classroom:classroom-students", args=[classroom_id])
+
+
+def import_students_url(classroom_id):
+    """Create and return a classroom roster import URL."""
+    return reverse("classroom:classroom-students-import", args=[classroom_id])
+
+
+def add_students_url(classroom_id):
+    """Create and return a classroom enrollment URL."""
+    return reverse("classroom:classroom-students-add", args=[classroom_id])
+
+
+def remove_students_url(classroom_id):
+    """Create and return a classroom unenrollment URL."""
+    return reverse("classroom:classroom-students-remove", args=[classroom_id])
+
 
 def create_user(**params):
     """Create and return a user."""
@@ -92,10 +155,10 @@ class TeacherClassroomAPITests(TestCase):
 
         res = self.client.get(CLASSROOM_URL)
 
-        classrooms = Class.objects.filter(teacher=self.teacher)
+        classrooms = ClassroomViewSet.queryset.filter(teacher=self.teacher)
         serializer = ClassroomSerializer(classrooms, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     def test_create_class(self):
         """Test creating a class with teacher as the creator."""
@@ -124,7 +187,7 @@ class TeacherClassroomAPITests(TestCase):
         res = self.client.get(CLASSROOM_URL)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 0)
+        self.assertEqual(len(res.data["results"]), 0)
 
     def test_teacher_can_create_class(self):
         """Test teacher can create classroom based on courses created by other teachers."""
@@ -143,6 +206,497 @@ class TeacherClassroomAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
 
 
+class GradebookAPITests(TestCase):
+    """Test the classroom gradebook."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = create_teacher(user=create_user(email="teacher@example.com"))
+        self.course = create_course(author=self.teacher)
+        self.student = create_student(
+            user=create_user(email="student@example.com", first_name="Ada")
+        )
+        self.other_student = create_student(user=create_user(email="other@example.com"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classroom = create_class(
+                teacher=self.teacher,
+                course=self.course,
+                students=[self.student, self.other_student],
+            )
+        self.assignments = [
+            Assignment.objects.create(
+                class_assigned=self.classroom,
+                title=f"Homework {i}",
+                description="Description",
+                due_date="2024-09-30",
+            )
+            for i in range(2)
+        ]
+        self.client.force_authenticate(self.teacher.user)
+
+    def grade(self, assignment, student, grade):
+        """Submit and grade an assignment for a student."""
+        with self.captureOnCommitCallbacks(execute=True):
+            submission = Submission.objects.create(
+                assignment=assignment, student=student, file="submissions/a.txt"
+            )
+            Grade.objects.create(submission=submission, grade=grade)
+        return submission
+
+    def test_gradebook_updated_from_grades(self):
+        """Test gradebook rows follow submission and grade changes."""
+        self.grade(self.assignments[0], self.student, 80.0)
+        self.grade(self.assignments[1], self.student, 90.0)
+
+        res = self.client.get(gradebook_url(self.classroom.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 2)
+        row = res.data[0]
+        self.assertEqual(row["student"], self.student.id)
+        self.assertEqual(row["first_name"], "Ada")
+        self.assertEqual(
+            row["scores"],
+            {str(self.assignments[0].id): 80.0, str(self.assignments[1].id): 90.0},
+        )
+        self.assertEqual(row["graded_count"], 2)
+        self.assertEqual(row["average"], 85.0)
+        self.assertEqual(res.data[1]["graded_count"], 0)
+
+    def test_gradebook_row_removed_on_unenroll(self):
+        """Test unenrolled students without submissions leave the gradebook."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classroom.students.remove(self.other_student)
+
+        self.assertFalse(
+            GradebookEntry.objects.filter(student=self.other_student).exists()
+        )
+
+    def test_student_sees_only_own_gradebook_row(self):
+        """Test a student only receives their own gradebook row."""
+        self.client.force_authenticate(self.student.user)
+
+        res = self.client.get(gradebook_url(self.classroom.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["student"] for row in res.data], [self.student.id])
+
+    def test_export_gradebook_csv(self):
+        """Test the gradebook is exported as a students by assignments CSV."""
+        self.grade(self.assignments[1], self.student, 90.0)
+
+        res = self.client.get(gradebook_export_url(self.classroom.id, "csv"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "text/csv")
+        content = b"".join(res.streaming_content).decode()
+        self.assertEqual(
+            list(csv.reader(StringIO(content))),
+            [
+                [
+                    "Last name",
+                    "First name",
+                    "Email",
+                    "Homework 0",
+                    "Homework 1",
+                    "Average",
+                ],
+                ["Last", "Ada", "student@example.com", "", "90.0", "90.0"],
+                ["Last", "First", "other@example.com", "", "", ""],
+            ],
+        )
+
+    def test_export_gradebook_csv_escapes_formulas(self):
+        """Test text cells a spreadsheet would run as formulas are escaped."""
+        self.assignments[0].title = '=HYPERLINK("http://example.com")'
+        self.assignments[0].save()
+        self.grade(self.assignments[1], self.student, 90.0)
+
+        res = self.client.get(gradebook_export_url(self.classroom.id, "csv"))
+
+        rows = list(csv.reader(StringIO(b"".join(res.streaming_content).decode())))
+        self.assertEqual(rows[0][3], '\'=HYPERLINK("http://example.com")')
+        self.assertEqual(rows[1][4], "90.0")
+
+    def test_export_gradebook_xlsx(self):
+        """Test the gradebook is exported as an XLSX workbook."""
+        self.grade(self.assignments[0], self.student, 80.0)
+
+        res = self.client.get(gradebook_export_url(self.classroom.id, "xlsx"))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        workbook = zipfile.ZipFile(BytesIO(b"".join(res.streaming_content)))
+        self.assertIsNone(workbook.testzip())
+        sheet = workbook.read("xl/worksheets/sheet1.xml").decode()
+        self.assertIn("<t>Homework 0</t>", sheet)
+        self.assertIn("<c><v>80.0</v></c>", sheet)
+
+    def test_student_cannot_export_gradebook(self):
+        """Test students cannot export the gradebook."""
+        self.client.force_authenticate(self.student.user)
+
+        res = self.client.get(gradebook_export_url(self.classroom.id, "csv"))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_rebuild_gradebook_command(self):
+        """Test the gradebook can be rebuilt from scratch."""
+        submission = self.grade(self.assignments[0], self.student, 70.0)
+        GradebookEntry.objects.all().delete()
+        Grade.objects.filter(submission=submission).update(grade=75.0)
+
+        call_command("rebuild_gradebook", stdout=StringIO())
+
+        entry = GradebookEntry.objects.get(student=self.student)
+        self.assertEqual(entry.scores, {str(self.assignments[0].id): 75.0})
+        self.assertEqual(GradebookEntry.objects.count(), 2)
+
+
+class EnrollmentAPITests(TestCase):
+    """Test bulk enrollment of students."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = create_teacher(user=create_user(email="teacher@example.com"))
+        self.students = [
+            create_student(user=create_user(email=f"student{i}@example.com"))
+            for i in range(4)
+        ]
+        self.classroom = create_class(
+            teacher=self.teacher,
+            course=create_course(author=self.teacher),
+            students=self.students[:1],
+        )
+        self.client.force_authenticate(self.teacher.user)
+
+    def test_add_students(self):
+        """Test only missing enrollments are inserted."""
+        payload = {"students": [student.id for student in self.students]}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                add_students_url(self.classroom.id), payload, format="json"
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"added": 3, "conflicts": {"students": {}}})
+        self.assertEqual(self.classroom.students.count(), 4)
+        # Enrollment signals still refresh the gradebook of the new students.
+        self.assertEqual(GradebookEntry.objects.count(), 3)
+
+    def test_add_unknown_students(self):
+        """Test unknown student ids are rejected without enrolling anyone."""
+        payload = {"students": [self.students[1].id, 0]}
+
+        res = self.client.post(
+            add_students_url(self.classroom.id), payload, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.classroom.students.count(), 1)
+
+    def test_remove_students(self):
+        """Test only existing enrollments are deleted."""
+        payload = {"students": [self.students[0].id, self.students[1].id]}
+
+        res = self.client.post(
+            remove_students_url(self.classroom.id), payload, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {"removed": 1})
+        self.assertFalse(self.classroom.students.exists())
+
+    def test_roster(self):
+        """Test the roster lists enrolled students with their names."""
+        self.classroom.students.add(self.students[2])
+
+        with self.assertNumQueries(2):
+            res = self.client.get(roster_url(self.classroom.id), {"page_size": 1})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"],
+            [
+                {
+                    "id": self.students[0].id,
+                    "email": "student0@example.com",
+                    "first_name": "First",
+                    "last_name": "Last",
+                }
+            ],
+        )
+        res = self.client.get(res.data["next"])
+        self.assertEqual(
+            [student["id"] for student in res.data["results"]], [self.students[2].id]
+        )
+
+    def test_classroom_student_count(self):
+        """Test classrooms carry their enrollment count."""
+        res = self.client.get(CLASSROOM_URL)
+
+        self.assertEqual(res.data["results"][0]["student_count"], 1)
+
+    def test_import_roster(self):
+        """Test a roster CSV creates missing accounts and enrolls everyone."""
+        content = (
+            "email,first_name,last_name,password\n"
+            "new@example.com,New,Student,newpass123\n"
+            "nopass@example.com,No,Password,\n"
+            "student1@example.com,Existing,Student,\n"
+            "teacher@example.com,Not,Student,\n"
+            "new@example.com,New,Again,\n"
+            "invalid,Bad,Email,\n"
+        )
+        file = SimpleUploadedFile("roster.csv", content.encode(), "text/csv")
+
+        res = self.client.post(
+            import_students_url(self.classroom.id), {"file": file}, format="multipart"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["created"], 2)
+        self.assertEqual(res.data["enrolled"], 3)
+        self.assertEqual([error["row"] for error in res.data["errors"]], [5, 6, 7])
+        new_user = get_user_model().objects.get(email="new@example.com")
+        self.assertTrue(new_user.check_password("newpass123"))
+        self.assertEqual(new_user.student.classes_enrolled.get(), self.classroom)
+        nopass_user = get_user_model().objects.get(email="nopass@example.com")
+        self.assertFalse(nopass_user.has_usable_password())
+        self.assertEqual(self.classroom.students.count(), 4)
+
+    def test_student_cannot_enroll(self):
+        """Test students cannot change enrollments."""
+        self.client.force_authenticate(self.students[0].user)
+        payload = {"students": [self.students[1].id]}
+
+        res = self.client.post(
+            add_students_url(self.classroom.id), payload, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class CloneClassroomAPITests(TestCase):
+    """Test cloning classrooms."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = create_teacher(user=create_user(email="teacher@example.com"))
+        self.student = create_student(user=create_user(email="student@example.com"))
+        self.classroom = create_class(
+            teacher=self.teacher,
+            course=create_course(author=self.teacher),
+            students=[self.student],
+        )
+        self.client.force_authenticate(self.teacher.user)
+
+    def create_assignments(self, count):
+        """Create assignments in the classroom."""
+        Assignment.objects.bulk_create(
+            Assignment(
+                class_assigned=self.classroom,
+                title=f"Homework {i}",
+                description="Description",
+                due_date=f"2024-02-{i + 1:02}",
+            )
+            for i in range(count)
+        )
+
+    def test_clone_classroom(self):
+        """Test the class and its assignments are copied to new dates."""
+        self.create_assignments(2)
+        payload = {"start_date": "2024-07-01"}
+
+        res = self.client.post(clone_url(self.classroom.id), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        clone = Class.objects.get(id=res.data["id"])
+        self.assertEqual(str(clone.end_date), "2025-07-01")
+        self.assertEqual(res.data["student_count"], 0)
+        self.assertEqual(
+            [
+                (assignment.title, str(assignment.due_date))
+                for assignment in clone.assignment_set.order_by("id")
+            ],
+            [("Homework 0", "2024-08-01"), ("Homework 1", "2024-08-02")],
+        )
+
+    def test_clone_queries_do_not_grow(self):
+        """Test cloning takes as many queries for any number of assignments."""
+        payload = {"start_date": "2025-01-01", "copy_students": True}
+        self.create_assignments(1)
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(clone_url(self.classroom.id), payload, format="json")
+
+        self.create_assignments(20)
+        with self.assertNumQueries(len(few)):
+            res = self.client.post(clone_url(self.classroom.id), payload, format="json")
+
+        self.assertEqual(res.data["student_count"], 1)
+        clone = Class.objects.get(id=res.data["id"])
+        self.assertEqual(clone.assignment_set.count(), 21)
+        self.assertEqual(list(clone.students.all()), [self.student])
+
+    def test_student_cannot_clone(self):
+        """Test students cannot clone their classes."""
+        self.client.force_authenticate(self.student.user)
+
+        res = self.client.post(
+            clone_url(self.classroom.id), {"start_date": "2025-01-01"}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ScheduleAPITests(TestCase):
+    """Test schedule conflicts and active classes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.teacher = create_teacher(user=create_user(email="teacher@example.com"))
+        self.course = create_course(author=self.teacher)
+        self.student = create_student(user=create_user(email="student@example.com"))
+        self.spring = create_class(
+            teacher=self.teacher,
+            course=self.course,
+            students=[self.student],
+            start_date="2024-01-01",
+            end_date="2024-06-30",
+        )
+        self.fall = create_class(
+            teacher=self.teacher,
+            course=self.course,
+            start_date="2024-09-01",
+            end_date="2024-12-31",
+        )
+        self.client.force_authenticate(self.teacher.user)
+
+    def test_create_reports_conflicts(self):
+        """Test classes overlapping others of the teacher or students are reported."""
+        payload = {
+            "course": self.course.id,
+            "start_date": "2024-06-30",
+            "end_date": "2024-08-31",
+            "students": [self.student.id],
+        }
+
+        res = self.client.post(CLASSROOM_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            res.data["conflicts"],
+            {
+                "teacher": [self.spring.id],
+                "students": {self.student.id: [self.spring.id]},
+            },
+        )
+
+    def test_create_end_before_start_rejected(self):
+        """Test a class cannot be created ending before it starts."""
+        payload = {
+            "course": self.course.id,
+            "start_date": "2024-08-31",
+            "end_date": "2024-06-30",
+        }
+
+        res = self.client.post(CLASSROOM_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("end_date", res.data)
+
+    def test_update_end_before_start_rejected(self):
+        """Test a partial update is checked against the stored dates."""
+        res = self.client.patch(detail_url(self.fall.id), {"end_date": "2024-08-31"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("end_date", res.data)
+
+    def test_update_ignores_own_dates(self):
+        """Test a class does not conflict with itself."""
+        res = self.client.patch(detail_url(self.fall.id), {"end_date": "2025-01-31"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["conflicts"], {"teacher": [], "students": {}})
+
+    @override_settings(CLASSROOM_REJECT_CONFLICTS=True)
+    def test_update_rejects_conflicts(self):
+        """Test overlapping dates are rejected when conflicts are rejected."""
+        res = self.client.patch(detail_url(self.fall.id), {"start_date": "2024-06-01"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["conflicts"]["teacher"], [str(self.spring.id)])
+        self.fall.refresh_from_db()
+        self.assertEqual(str(self.fall.start_date), "2024-09-01")
+
+    def test_clone_reports_conflicts(self):
+        """Test a copy overlapping other classes reports the conflicts."""
+        payload = {
+            "start_date": "2024-06-01",
+            "end_date": "2024-08-31",
+            "copy_students": True,
+        }
+
+        res = self.client.post(clone_url(self.spring.id), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            res.data["conflicts"],
+            {
+                "teacher": [self.spring.id],
+                "students": {self.student.id: [self.spring.id]},
+            },
+        )
+
+    @override_settings(CLASSROOM_REJECT_CONFLICTS=True)
+    def test_clone_rejects_conflicts(self):
+        """Test a copy overlapping other classes is rejected when configured."""
+        payload = {"start_date": "2024-12-01", "end_date": "2025-03-31"}
+
+        res = self.client.post(clone_url(self.spring.id), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data["conflicts"]["teacher"], [str(self.fall.id)])
+        self.assertEqual(Class.objects.count(), 2)
+
+    def test_enrollment_reports_conflicts(self):
+        """Test enrolling students already in overlapping classes is reported."""
+        summer = create_class(
+            teacher=create_teacher(user=create_user(email="other@example.com")),
+            course=self.course,
+            start_date="2024-06-01",
+            end_date="2024-08-31",
+        )
+        self.client.force_authenticate(summer.teacher.user)
+
+        res = self.client.post(
+            add_students_url(summer.id), {"students": [self.student.id]}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data["conflicts"], {"students": {self.student.id: [self.spring.id]}}
+        )
+        self.assertTrue(summer.students.filter(id=self.student.id).exists())
+
+    def test_active_classes(self):
+        """Test listing the classes running on a date."""
+        res = self.client.get(ACTIVE_URL, {"on": "2024-06-30"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [classroom["id"] for classroom in res.data["results"]], [self.spring.id]
+        )
+        res = self.client.get(ACTIVE_URL, {"on": "2024-07-01"})
+        self.assertEqual(res.data["results"], [])
+
+    def test_active_classes_invalid_date(self):
+        """Test an invalid date is rejected."""
+        res = self.client.get(ACTIVE_URL, {"on": "tomorrow"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
 class StudentClassroomAPITests(TestCase):
     """Test authenticated student API requests."""
 
@@ -161,10 +715,12 @@ class StudentClassroomAPITests(TestCase):
 
         res = self.client.get(CLASSROOM_URL)
 
-        classrooms = Class.objects.filter(students=self.student)
+        classrooms = ClassroomViewSet.queryset.filter(students=self.student)
         serializer = ClassroomSerializer(classrooms, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
+        self.assertEqual(res.data["results"][0]["student_count"], 1)
+        self.assertNotIn("students", res.data["results"][0])
 
     def test_student_cannot_create_class(self):
         """Test that a student cannot create a class."""
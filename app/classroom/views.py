@@ -2,44 +2,345 @@
 Views for the classroom APIs.
 """
 
-from rest_framework import viewsets
-from rest_framework_simplejwt.authentication import JWTAuthentication
+import codecs
+import csv
+from datetime import date
+
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 
-from core.models import Class, Teacher
+from core.downloads import streaming_content
+from core.enrollment import enrolled_class_ids
+from core.exports import gradebook_matrix, iter_csv, iter_xlsx
+from core.models import Assignment, Class, GradebookEntry, Student
+from core.pagination import KeysetPagination, RosterPagination
+from core.roles import STUDENT, TEACHER, ProfileJWTAuthentication, RoleMixin
+from core.roster import import_roster
+from core.schedule import active_classes, student_conflicts, teacher_conflicts
 from classroom import serializers
 
+GRADEBOOK_EXPORTS = {
+    "csv": (iter_csv, "text/csv"),
+    "xlsx": (
+        iter_xlsx,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ),
+}
+
 
-class ClassroomViewSet(viewsets.ModelViewSet):
+class ClassroomViewSet(RoleMixin, viewsets.ModelViewSet):
     """View for managing classroom API."""
 
     serializer_class = serializers.ClassroomSerializer
-    queryset = Class.objects.all()
-    authentication_classes = [JWTAuthentication]
+    # Counted per class in a subquery, listing does not join the enrollments.
+    queryset = Class.objects.annotate(
+        student_count=Coalesce(
+            Subquery(
+                Class.students.through.objects.filter(class_id=OuterRef("pk"))
+                .values("class_id")
+                .annotate(count=Count("*"))
+                .values("count")
+            ),
+            0,
+        )
+    )
+    authentication_classes = [ProfileJWTAuthentication]
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Retrieve classrooms depending on user."""
-        if hasattr(self.request.user, "teacher"):
+        if self.request.role == TEACHER:
             # Teacher sees only their own classes
-            return self.queryset.filter(teacher=self.request.user.teacher).order_by(
-                "-id"
-            )
-        elif hasattr(self.request.user, "student"):
+            return self.queryset.filter(teacher=self.request.profile).order_by("-id")
+        elif self.request.role == STUDENT:
             # Student sees only classes they are enrolled in
-            return self.queryset.filter(students=self.request.user.student).order_by(
-                "-id"
-            )
+            return self.queryset.filter(
+                id__in=enrolled_class_ids(self.request.profile.id)
+            ).order_by("-id")
         else:
             raise PermissionDenied(
                 "Access denied: Only students or teachers can access this view."
             )
 
+    def schedule_conflicts(self, serializer, teacher_id):
+        """Return the schedule conflicts of a class being saved."""
+        data = serializer.validated_data
+        classroom = serializer.instance
+        start = data.get("start_date", getattr(classroom, "start_date", None))
+        end = data.get("end_date", getattr(classroom, "end_date", None))
+        class_id = getattr(classroom, "id", None)
+        if "students" in data:
+            student_ids = [student.id for student in data["students"]]
+        elif classroom is not None:
+            student_ids = Class.students.through.objects.filter(
+                class_id=class_id
+            ).values_list("student_id", flat=True)
+        else:
+            student_ids = []
+
+        return self.date_conflicts(
+            teacher_id, student_ids, start, end, exclude=class_id
+        )
+
+    def date_conflicts(self, teacher_id, student_ids, start, end, exclude=None):
+        """
+        Return the other classes of the teacher and of the students that
+        overlap the dates.
+
+        Raises ValidationError if there are any and conflicts are rejected.
+        """
+        conflicts = {
+            "teacher": teacher_conflicts(teacher_id, start, end, exclude=exclude),
+            "students": student_conflicts(student_ids, start, end, exclude=exclude),
+        }
+        if settings.CLASSROOM_REJECT_CONFLICTS and (
+            conflicts["teacher"] or conflicts["students"]
+        ):
+            raise ValidationError({"conflicts": conflicts})
+        return conflicts
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.data["conflicts"] = self.conflicts
+        return response
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        response.data["conflicts"] = self.conflicts
+        return response
+
     def perform_create(self, serializer):
         """Create a classroom based on teacher's courses or others' courses."""
-        try:
-            teacher = Teacher.objects.get(user=self.request.user)
-            serializer.save(teacher=teacher)
-        except Teacher.DoesNotExist:
+        if self.request.role != TEACHER:
             raise PermissionDenied("You must be a teacher to create a classroom.")
+        teacher = self.request.profile
+        self.conflicts = self.schedule_conflicts(serializer, teacher.id)
+        serializer.save(teacher=teacher)
+
+    def perform_update(self, serializer):
+        self.conflicts = self.schedule_conflicts(
+            serializer, serializer.instance.teacher_id
+        )
+        serializer.save()
+
+    @action(detail=False, methods=["get"])
+    def active(self, request):
+        """
+        List the classes running on the `on` date, today by default.
+
+        Classes are matched on their date range with the range index on
+        Postgres, see `core.schedule`.
+        """
+        on = request.query_params.get("on")
+        try:
+            day = date.fromisoformat(on) if on else timezone.localdate()
+        except ValueError:
+            raise ValidationError({"on": "Enter a valid date, YYYY-MM-DD."})
+
+        page = self.paginate_queryset(active_classes(self.get_queryset(), day))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=["get"])
+    def gradebook(self, request, pk=None):
+        """Return the gradebook of the class, students see only their own row."""
+        classroom = self.get_object()
+        entries = (
+            GradebookEntry.objects.filter(classroom=classroom)
+            .select_related("student__user")
+            .order_by("student_id")
+        )
+        if request.role == STUDENT:
+            entries = entries.filter(student=request.profile)
+
+        serializer = serializers.GradebookEntrySerializer(entries, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=["get"], pagination_class=RosterPagination)
+    def students(self, request, pk=None):
+        """List the students enrolled in the class, page by page."""
+        classroom = self.get_object()
+        if request.role != TEACHER:
+            raise PermissionDenied("Only the teacher of the class can view the roster.")
+
+        students = Student.objects.filter(classes_enrolled=classroom).select_related(
+            "user"
+        )
+        page = self.paginate_queryset(students)
+        serializer = serializers.RosterStudentSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="students/import",
+        url_name="students-import",
+        parser_classes=[MultiPartParser],
+    )
+    def import_students(self, request, pk=None):
+        """
+        Create the accounts of an uploaded roster CSV `file` and enroll them.
+
+        See `core.roster.import_roster` for the expected columns. Invalid
+        rows are reported by their line number.
+        """
+        classroom = self.get_object()
+        if request.role != TEACHER:
+            raise PermissionDenied("Only the teacher of the class can enroll students.")
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "This field is required."})
+
+        try:
+            created, enrolled, errors = import_roster(
+                classroom, codecs.iterdecode(upload, "utf-8-sig")
+            )
+        except (UnicodeDecodeError, csv.Error, ValueError) as error:
+            raise ValidationError({"file": str(error)})
+        return Response({"created": created, "enrolled": enrolled, "errors": errors})
+
+    def get_enrollment_change(self, request):
+        """Return the class and validated student ids of an enrollment change."""
+        classroom = self.get_object()
+        if request.role != TEACHER:
+            raise PermissionDenied("Only the teacher of the class can enroll students.")
+        serializer = serializers.EnrollmentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return classroom, serializer.validated_data["students"]
+
+    def enrolled_students(self, classroom, student_ids):
+        """Return which of the given students are enrolled, with one query."""
+        return set(
+            Class.students.through.objects.filter(
+                class_id=classroom.id, student_id__in=student_ids
+            ).values_list("student_id", flat=True)
+        )
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="students/add",
+        url_name="students-add",
+    )
+    def add_students(self, request, pk=None):
+        """Enroll a list of students, only inserting the missing enrollments."""
+        classroom, student_ids = self.get_enrollment_change(request)
+        added = student_ids - self.enrolled_students(classroom, student_ids)
+        conflicts = student_conflicts(
+            added, classroom.start_date, classroom.end_date, exclude=classroom.id
+        )
+        if settings.CLASSROOM_REJECT_CONFLICTS and conflicts:
+            raise ValidationError({"conflicts": {"students": conflicts}})
+        if added:
+            classroom.students.add(*added)
+        return Response({"added": len(added), "conflicts": {"students": conflicts}})
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="students/remove",
+        url_name="students-remove",
+    )
+    def remove_students(self, request, pk=None):
+        """Unenroll a list of students, only deleting existing enrollments."""
+        classroom, student_ids = self.get_enrollment_change(request)
+        removed = self.enrolled_students(classroom, student_ids)
+        if removed:
+            classroom.students.remove(*removed)
+        return Response({"removed": len(removed)})
+
+    @action(detail=True, methods=["post"])
+    def clone(self, request, pk=None):
+        """
+        Copy the class and its assignments to new dates.
+
+        Due dates move by as much as the start date. Without an `end_date`
+        the copy lasts as long as the class. With `copy_students` the
+        students are enrolled in the copy too. Assignments are copied with
+        one insert, so the number of queries does not depend on their count.
+        Schedule conflicts of the copy are reported, or rejected, as on create.
+        """
+        classroom = self.get_object()
+        if request.role != TEACHER:
+            raise PermissionDenied("Only the teacher of the class can clone it.")
+
+        serializer = serializers.ClassroomCloneSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        options = serializer.validated_data
+        shift = options["start_date"] - classroom.start_date
+        start_date = options["start_date"]
+        end_date = options.get("end_date", classroom.end_date + shift)
+        student_ids = []
+        if options["copy_students"]:
+            student_ids = list(
+                Class.students.through.objects.filter(
+                    class_id=classroom.id
+                ).values_list("student_id", flat=True)
+            )
+        conflicts = self.date_conflicts(
+            classroom.teacher_id, student_ids, start_date, end_date
+        )
+
+        with transaction.atomic():
+            clone = Class.objects.create(
+                course_id=classroom.course_id,
+                teacher_id=classroom.teacher_id,
+                start_date=start_date,
+                end_date=end_date,
+            )
+            Assignment.objects.bulk_create(
+                [
+                    Assignment(
+                        class_assigned=clone,
+                        title=title,
+                        description=description,
+                        due_date=due_date + shift,
+                    )
+                    for title, description, due_date in Assignment.objects.filter(
+                        class_assigned=classroom
+                    )
+                    .order_by("id")
+                    .values_list("title", "description", "due_date")
+                ]
+            )
+            if student_ids:
+                clone.students.add(*student_ids)
+
+        clone.student_count = len(student_ids)
+        data = serializers.ClassroomSerializer(clone).data
+        data["conflicts"] = conflicts
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(
+        detail=True,
+        methods=["get"],
+        url_path="gradebook/(?P<export_format>csv|xlsx)",
+        url_name="gradebook-export",
+    )
+    def gradebook_export(self, request, export_format, pk=None):
+        """Stream the gradebook as a students by assignments CSV or XLSX file."""
+        classroom = self.get_object()
+        if request.role != TEACHER:
+            raise PermissionDenied("Only teachers can export the gradebook.")
+
+        render, content_type = GRADEBOOK_EXPORTS[export_format]
+        response = StreamingHttpResponse(
+            streaming_content(request, render(gradebook_matrix(classroom))),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="class-{classroom.id}-gradebook.{export_format}"'
+        )
+        return response
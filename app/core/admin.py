@@ -57,5 +57,8 @@ admin.site.register(models.Course)
 admin.site.register(models.Class)
 admin.site.register(models.Assignment)
 admin.site.register(models.Submission)
+admin.site.register(models.SubmissionUpload)
 admin.site.register(models.Grade)
+admin.site.register(models.GradebookEntry)
+admin.site.register(models.Tombstone)
 admin.site.register(models.PasswordReset)
@@ -0,0 +1,68 @@
+"""
+Shared cache of the course catalog responses.
+
+Responses are cached with the catalog version they were built from under
+a request key, a JSON serializable description of the request. Saving or
+deleting any course bumps the version, which makes every cached response
+stale at once without finding and deleting them. The version and a
+response are read with one cache round trip.
+
+Cached responses are shared by every user. A request key must hold every
+input the response depends on, with values that depend on the user, like
+`author=me`, resolved to what they stand for. Responses that depend on the
+user in any other way must not be cached here.
+"""
+
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = "course-catalog:version"
+
+CATALOG_CACHE_TIMEOUT = 60 * 60
+
+
+def catalog_cache_key(request_key):
+    encoded = json.dumps(request_key, sort_keys=True).encode()
+    digest = hashlib.md5(encoded, usedforsecurity=False).hexdigest()
+    return f"course-catalog:{digest}"
+
+
+def new_catalog_version():
+    """
+    Start a version unrelated to previous ones, so responses cached before
+    the version was evicted are never served.
+    """
+    cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+
+
+def get_cached_catalog(request_key):
+    """
+    Return the current catalog version and the response data cached for a
+    request key, None if it is missing or stale.
+    """
+    key = catalog_cache_key(request_key)
+    cached = cache.get_many([CATALOG_VERSION_KEY, key])
+    version = cached.get(CATALOG_VERSION_KEY)
+    if version is None:
+        new_catalog_version()
+        return None, None
+    entry = cached.get(key)
+    if entry is None or entry[0] != version:
+        return version, None
+    return version, entry[1]
+
+
+def set_cached_catalog(request_key, version, data):
+    """Cache the response data of a request key built from a catalog version."""
+    cache.set(catalog_cache_key(request_key), (version, data), CATALOG_CACHE_TIMEOUT)
+
+
+def bump_catalog_version():
+    """Make every cached catalog response stale."""
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        new_catalog_version()
@@ -0,0 +1,203 @@
+"""
+Helpers for serving stored files.
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+import time
+import zipfile
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import parse_etags, quote_etag
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(field_file):
+    """Return an entity tag for a stored file."""
+    digest = hashlib.md5(f"{field_file.name}:{field_file.size}".encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def parse_range(header, size):
+    """
+    Return the (start, end) byte positions of a single range request.
+
+    Returns None when the header is missing or not a single byte range, in
+    which case the whole file is served. Raises ValueError when the range
+    cannot be satisfied.
+    """
+    match = RANGE_RE.match(header or "")
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range, e.g. "bytes=-500" for the last 500 bytes.
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+
+    if start > end or start >= size:
+        raise ValueError("Range not satisfiable.")
+    return start, end
+
+
+async def aiter_chunks(iterator):
+    """Yield the chunks of a sync iterator, reading each one in a thread."""
+    iterator = iter(iterator)
+    try:
+        while True:
+            chunk = await sync_to_async(next)(iterator, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        if hasattr(iterator, "close"):
+            await sync_to_async(iterator.close)()
+
+
+def is_asgi_request(request):
+    """Return whether a (DRF or Django) request is served through ASGI."""
+    return isinstance(getattr(request, "_request", request), ASGIRequest)
+
+
+def streaming_content(request, iterator):
+    """
+    Return the content of a streaming response to the request.
+
+    Under ASGI, Django consumes a sync iterator whole in one thread before
+    sending anything, so the iterator is wrapped to be read chunk by chunk.
+    """
+    if is_asgi_request(request):
+        return aiter_chunks(iterator)
+    return iterator
+
+
+def iter_range(file, start, length):
+    """Yield `length` bytes of an open file starting at `start`."""
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def serve_file(request, field_file):
+    """
+    Return a response that sends a stored file to the client.
+
+    Depending on `settings.FILE_DOWNLOAD_OFFLOAD` the transfer is handed to
+    the front proxy with an `X-Accel-Redirect` (nginx) or `X-Sendfile`
+    (Apache, lighttpd) header and the response body stays empty. Otherwise
+    the file is streamed with a `FileResponse`, which lets the WSGI server
+    use `sendfile()`, honouring single byte `Range` requests. Under ASGI the
+    whole file is streamed by ranges too, see `streaming_content()`.
+    """
+    filename = os.path.basename(field_file.name)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    etag = file_etag(field_file)
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and etag in parse_etags(if_none_match) + ["*"]:
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+
+    offload = settings.FILE_DOWNLOAD_OFFLOAD
+    if offload == "x-accel-redirect":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = quote(
+            settings.FILE_DOWNLOAD_ACCEL_PREFIX + field_file.name
+        )
+    elif offload == "x-sendfile":
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = field_file.path
+    else:
+        size = field_file.size
+        try:
+            byte_range = parse_range(request.headers.get("Range"), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        if byte_range is None and not is_asgi_request(request):
+            response = FileResponse(field_file.open("rb"), content_type=content_type)
+        else:
+            start, end = byte_range or (0, size - 1)
+            response = StreamingHttpResponse(
+                streaming_content(
+                    request,
+                    iter_range(field_file.open("rb"), start, end - start + 1),
+                ),
+                status=200 if byte_range is None else 206,
+                content_type=content_type,
+            )
+            response["Content-Length"] = str(end - start + 1)
+            if byte_range is not None:
+                response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Accept-Ranges"] = "bytes"
+
+    response["ETag"] = etag
+    response["Content-Disposition"] = f"attachment; filename*=UTF-8''{quote(filename)}"
+    return response
+
+
+class ZipStream:
+    """Write-only file object collecting the bytes written by `ZipFile`."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        """Return and forget the bytes written since the last call."""
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_zip(entries):
+    """
+    Yield a ZIP archive of `(arcname, field_file)` entries as it is built.
+
+    The archive is written to a non-seekable stream, so `ZipFile` emits
+    data descriptors instead of seeking back, and every chunk is yielded as
+    soon as it is compressed. Only one chunk of one file is held in memory
+    at a time, whatever the size of the archive.
+    """
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for arcname, field_file in entries:
+            info = zipfile.ZipInfo(arcname, time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with field_file.open("rb"):
+                with archive.open(info, "w", force_zip64=True) as dest:
+                    for chunk in field_file.chunks(STREAM_CHUNK_SIZE):
+                        dest.write(chunk)
+                        yield stream.pop()
+            yield stream.pop()
+    yield stream.pop()
@@ -0,0 +1,105 @@
+"""
+Cached enrollment membership of students.
+
+The ids of the classes a student is enrolled in are cached in the shared
+cache and, for a few seconds, in a small in-process LRU in front of it, so
+membership checks on hot paths cost no query. Shared entries are stored
+under a per-student version that is dropped when the enrollments of the
+student change, so a lookup that read the database before a change never
+caches its stale result where later lookups find it.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from core.models import Class
+
+ENROLLMENT_CACHE_TIMEOUT = 60 * 60
+
+# Other processes only invalidate the shared cache, local entries are kept
+# shortly to bound how long they can be stale.
+LOCAL_CACHE_TIMEOUT = 10
+
+LOCAL_CACHE_SIZE = 10000
+
+
+class LocalLRU:
+    """Thread safe in-process LRU mapping with expiring entries."""
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + self.timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+
+local_cache = LocalLRU(LOCAL_CACHE_SIZE, LOCAL_CACHE_TIMEOUT)
+
+
+def enrollment_cache_key(student_id):
+    """Key of the version of the cached enrollments of a student."""
+    return f"enrolled-classes:{student_id}"
+
+
+def load_enrolled_class_ids(student_id):
+    return frozenset(
+        Class.students.through.objects.filter(student_id=student_id).values_list(
+            "class_id", flat=True
+        )
+    )
+
+
+def enrolled_class_ids(student_id):
+    """Return the ids of the classes a student is enrolled in."""
+    key = enrollment_cache_key(student_id)
+    class_ids = local_cache.get(key)
+    if class_ids is None:
+        # Read before the database, so a change meanwhile drops this version.
+        cache.add(key, uuid.uuid4().hex, ENROLLMENT_CACHE_TIMEOUT)
+        version = cache.get(key)
+        class_ids = cache.get(f"{key}:{version}")
+        if class_ids is None:
+            class_ids = load_enrolled_class_ids(student_id)
+            cache.set(f"{key}:{version}", class_ids, ENROLLMENT_CACHE_TIMEOUT)
+        local_cache.set(key, class_ids)
+    return class_ids
+
+
+def is_enrolled(student_id, class_id):
+    """Return whether a student is enrolled in a class."""
+    return class_id in enrolled_class_ids(student_id)
+
+
+def invalidate_enrollments(student_ids):
+    """Drop the cached enrollments of the given students."""
+    keys = [enrollment_cache_key(student_id) for student_id in student_ids]
+    local_cache.delete_many(keys)
+    cache.delete_many(keys)
@@ -0,0 +1,201 @@
+"""
+Fan-out of real-time events to streaming clients.
+
+Events are published to named channels after the transaction that caused
+them commits. Subscribers live in the ASGI process serving their stream;
+the in-process broker hands events to the subscribers of the same process
+and the Postgres broker relays them to every node with LISTEN/NOTIFY.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    DatabaseError,
+    connection,
+    connections,
+    transaction,
+)
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "core_events"
+
+# Events of a subscriber that stops reading are dropped past this many.
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+def student_channel(student_id):
+    return f"student:{student_id}"
+
+
+def class_channel(class_id):
+    return f"class:{class_id}"
+
+
+def grade_event(submission_id, assignment_id, grade):
+    return {
+        "type": "grade",
+        "submission": submission_id,
+        "assignment": assignment_id,
+        "grade": grade,
+    }
+
+
+def assignment_event(assignment):
+    return {
+        "type": "assignment",
+        "id": assignment.pk,
+        "class": assignment.class_assigned_id,
+        "title": assignment.title,
+        "due_date": assignment.due_date,
+    }
+
+
+class Subscription:
+    """The queue of events of some channels for one streaming client."""
+
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = set(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(SUBSCRIPTION_QUEUE_SIZE)
+
+    def __enter__(self):
+        self.broker.add(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.broker.remove(self)
+
+    def put(self, event):
+        """Queue an event, may be called from any thread."""
+        self.loop.call_soon_threadsafe(self.put_nowait, event)
+
+    def put_nowait(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            logger.warning("Dropped event of a slow subscriber: %s", event)
+
+    async def get(self, timeout=None):
+        """Return the next event, raise TimeoutError after `timeout` seconds."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class InProcessBroker:
+    """Deliver events to the subscribers of the current process."""
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def subscribe(self, channels):
+        """Return a subscription to use as context manager in the event loop."""
+        return Subscription(self, channels)
+
+    def add(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                self.subscribers[channel].add(subscription)
+
+    def remove(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                self.subscribers[channel].discard(subscription)
+                if not self.subscribers[channel]:
+                    del self.subscribers[channel]
+
+    def publish(self, messages):
+        """Publish an iterable of (channel, event) pairs."""
+        for channel, event in messages:
+            self.dispatch(channel, event)
+
+    def dispatch(self, channel, event):
+        with self.lock:
+            subscriptions = list(self.subscribers.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.put(event)
+
+
+class PostgresBroker(InProcessBroker):
+    """
+    Deliver events to the subscribers of every process through Postgres.
+
+    Messages are sent with one NOTIFY statement per publish. Each process
+    with subscribers runs a thread that LISTENs on a dedicated connection
+    and dispatches what it receives to its local subscribers.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.listener = None
+
+    def add(self, subscription):
+        super().add(subscription)
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(
+                    target=self.listen, name="core-events-listener", daemon=True
+                )
+                self.listener.start()
+
+    def publish(self, messages):
+        payloads = [
+            json.dumps({"channel": channel, "event": event}, cls=DjangoJSONEncoder)
+            for channel, event in messages
+        ]
+        if not payloads:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+                [NOTIFY_CHANNEL, payloads],
+            )
+
+    def listen(self):
+        while True:
+            listener = connections.create_connection(DEFAULT_DB_ALIAS)
+            try:
+                listener.ensure_connection()
+                with listener.cursor() as cursor:
+                    cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                with listener.wrap_database_errors:
+                    self.receive(listener.connection)
+            except DatabaseError:
+                logger.exception("Event listener lost its connection")
+            finally:
+                listener.close()
+            time.sleep(1)
+
+    def receive(self, raw_connection):
+        while True:
+            if select.select([raw_connection], [], [], 5) == ([], [], []):
+                continue
+            raw_connection.poll()
+            while raw_connection.notifies:
+                message = json.loads(raw_connection.notifies.pop(0).payload)
+                self.dispatch(message["channel"], message["event"])
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """Return the broker of the process, Postgres backed on Postgres."""
+    if connection.vendor == "postgresql":
+        return PostgresBroker()
+    return InProcessBroker()
+
+
+def publish(messages):
+    """Publish (channel, event) pairs once the current transaction commits."""
+    messages = list(messages)
+    if messages:
+        transaction.on_commit(lambda: get_broker().publish(messages))
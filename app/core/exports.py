@@ -0,0 +1,171 @@
+"""
+Streaming exports of the gradebook.
+"""
+
+import csv
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+from core.downloads import ZipStream
+from core.models import Assignment, GradebookEntry
+
+EXPORT_CHUNK_SIZE = 500
+
+# Rows are buffered into chunks of about this many bytes before being sent.
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+
+def gradebook_matrix(classroom):
+    """
+    Yield the gradebook of a class as rows, one column per assignment.
+
+    The first row is the header. Student rows are read from the gradebook
+    with one ordered query iterated in chunks, a server-side cursor on
+    Postgres, so memory does not grow with the number of students.
+    """
+    assignments = list(
+        Assignment.objects.filter(class_assigned=classroom)
+        .order_by("due_date", "id")
+        .values_list("id", "title")
+    )
+    titles = [title for _, title in assignments]
+    yield ["Last name", "First name", "Email", *titles, "Average"]
+
+    entries = (
+        GradebookEntry.objects.filter(classroom=classroom)
+        .order_by("student__user__last_name", "student__user__first_name", "student")
+        .values_list(
+            "student__user__last_name",
+            "student__user__first_name",
+            "student__user__email",
+            "scores",
+            "average",
+        )
+    )
+    for last_name, first_name, email, scores, average in entries.iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    ):
+        grades = [scores.get(str(assignment_id)) for assignment_id, _ in assignments]
+        yield [last_name, first_name, email, *grades, average]
+
+
+class Echo:
+    """File object returning what is written, to stream `csv.writer` rows."""
+
+    def write(self, value):
+        return value
+
+
+def buffered(chunks):
+    """Join small text chunks into about `EXPORT_BUFFER_SIZE` large ones."""
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= EXPORT_BUFFER_SIZE:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+# Spreadsheets run text cells starting with these as formulas.
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def csv_cell(value):
+    """Quote text a spreadsheet would read as a formula, keep numbers as is."""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def iter_csv(rows):
+    """Yield rows as CSV text, with formula-like text cells escaped."""
+    writer = csv.writer(Echo())
+    return buffered(writer.writerow([csv_cell(value) for value in row]) for row in rows)
+
+
+XLSX_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" '
+        'ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/'
+        'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+        'relationships"><Relationship Id="rId1" Type="http://schemas.'
+        'openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/></Relationships>'
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/'
+        'main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/'
+        'relationships"><sheets><sheet name="Gradebook" sheetId="1" '
+        'r:id="rId1"/></sheets></workbook>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+        'relationships"><Relationship Id="rId1" Type="http://schemas.'
+        'openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/></Relationships>'
+    ),
+}
+
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    "<sheetData>"
+)
+
+XLSX_SHEET_END = "</sheetData></worksheet>"
+
+
+def xlsx_cell(value):
+    if value is None:
+        return "<c/>"
+    if isinstance(value, (int, float)):
+        return f"<c><v>{value}</v></c>"
+    return f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def iter_xlsx(rows):
+    """
+    Yield rows as an XLSX workbook of one sheet as it is built.
+
+    The sheet uses inline strings so it can be written in one pass, and the
+    archive is streamed like `core.downloads.iter_zip`.
+    """
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+        yield stream.pop()
+
+        info = zipfile.ZipInfo("xl/worksheets/sheet1.xml", time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_DEFLATED
+        with archive.open(info, "w", force_zip64=True) as sheet:
+            sheet.write(XLSX_SHEET_START.encode())
+            xml_rows = (
+                "<row>{}</row>".format("".join(xlsx_cell(value) for value in row))
+                for row in rows
+            )
+            for chunk in buffered(xml_rows):
+                sheet.write(chunk.encode())
+                yield stream.pop()
+            sheet.write(XLSX_SHEET_END.encode())
+        yield stream.pop()
+    yield stream.pop()
@@ -0,0 +1,66 @@
+"""
+GPA computation for students.
+"""
+
+from decimal import Decimal
+
+import numpy as np
+
+from core.models import Grade, Student
+
+# Lower bounds of the percentage bands and the grade points they earn.
+GRADE_THRESHOLDS = np.array([60, 63, 67, 70, 73, 77, 80, 83, 87, 90, 93])
+GRADE_POINTS = np.array([0.0, 0.7, 1.0, 1.3, 1.7, 2.0, 2.3, 2.7, 3.0, 3.3, 3.7, 4.0])
+
+BATCH_SIZE = 5000
+
+
+def compute_gpas(student_ids):
+    """
+    Return a mapping of student id to GPA for the given students.
+
+    All grades of the students are read with one query and averaged per
+    student as grade points with NumPy. Students without grades map to None.
+    """
+    student_ids = list(student_ids)
+    rows = list(
+        Grade.objects.filter(submission__student_id__in=student_ids).values_list(
+            "submission__student_id", "grade"
+        )
+    )
+    gpas = dict.fromkeys(student_ids)
+    if not rows:
+        return gpas
+
+    owners, grades = np.array(rows, dtype=float).T
+    points = GRADE_POINTS[np.searchsorted(GRADE_THRESHOLDS, grades, side="right")]
+    owners, index = np.unique(owners.astype(np.int64), return_inverse=True)
+    averages = np.bincount(index, weights=points) / np.bincount(index)
+
+    for student_id, average in zip(owners.tolist(), np.round(averages, 2).tolist()):
+        gpas[student_id] = Decimal(str(average))
+    return gpas
+
+
+def update_gpas(student_ids):
+    """Recompute and store the GPA of the given students."""
+    gpas = compute_gpas(student_ids)
+    Student.objects.bulk_update(
+        [Student(id=student_id, gpa=gpa) for student_id, gpa in gpas.items()],
+        ["gpa"],
+        batch_size=1000,
+    )
+    return len(gpas)
+
+
+def recompute_all_gpas(batch_size=BATCH_SIZE):
+    """Recompute the GPA of every student, `batch_size` students at a time."""
+    student_ids = Student.objects.order_by("id").values_list("id", flat=True)
+    count = 0
+    last_id = 0
+    while True:
+        batch = list(student_ids.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return count
+        count += update_gpas(batch)
+        last_id = batch[-1]
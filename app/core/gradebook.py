@@ -0,0 +1,137 @@
+"""
+Maintenance of the denormalized gradebook.
+"""
+
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import Class, GradebookEntry, Submission
+
+REBUILD_BATCH_SIZE = 100
+
+
+def refresh_gradebook(pairs):
+    """
+    Recompute the gradebook rows of the given (class id, student id) pairs.
+
+    A row is kept while the student is enrolled in the class or has a
+    submission in it, and is deleted otherwise. Enrollments and submissions
+    of all pairs are read with one query each and the rows are upserted
+    with one statement.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return
+
+    class_ids = {class_id for class_id, _ in pairs}
+    student_ids = {student_id for _, student_id in pairs}
+    enrolled = set(
+        Class.students.through.objects.filter(
+            class_id__in=class_ids, student_id__in=student_ids
+        ).values_list("class_id", "student_id")
+    )
+    submissions = (
+        Submission.objects.filter(
+            assignment__class_assigned_id__in=class_ids,
+            student_id__in=student_ids,
+        )
+        .values_list(
+            "assignment__class_assigned_id",
+            "student_id",
+            "assignment_id",
+            "grade__grade",
+        )
+        .order_by("submitted_date", "id")
+    )
+
+    submitted = defaultdict(set)
+    scores = defaultdict(dict)
+    for class_id, student_id, assignment_id, grade in submissions:
+        submitted[class_id, student_id].add(assignment_id)
+        if grade is not None:
+            # Later submissions override earlier grades for the assignment.
+            scores[class_id, student_id][str(assignment_id)] = grade
+
+    entries = []
+    stale = []
+    for pair in pairs:
+        if pair not in enrolled and pair not in submitted:
+            stale.append(pair)
+            continue
+        entry_scores = scores[pair]
+        entries.append(
+            GradebookEntry(
+                classroom_id=pair[0],
+                student_id=pair[1],
+                scores=entry_scores,
+                submitted_count=len(submitted[pair]),
+                graded_count=len(entry_scores),
+                average=(
+                    sum(entry_scores.values()) / len(entry_scores)
+                    if entry_scores
+                    else None
+                ),
+            )
+        )
+
+    if stale:
+        condition = Q()
+        for class_id, student_id in stale:
+            condition |= Q(classroom_id=class_id, student_id=student_id)
+        GradebookEntry.objects.filter(condition).delete()
+
+    GradebookEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=["classroom", "student"],
+        update_fields=[
+            "scores",
+            "submitted_count",
+            "graded_count",
+            "average",
+            "updated",
+        ],
+    )
+
+
+def gradebook_pairs_for_submissions(submission_ids):
+    """Return the (class id, student id) pairs of the given submissions."""
+    return set(
+        Submission.objects.filter(id__in=submission_ids).values_list(
+            "assignment__class_assigned_id", "student_id"
+        )
+    )
+
+
+def rebuild_gradebook(class_ids=None):
+    """
+    Rebuild the gradebook from scratch, optionally for some classes only.
+
+    Every enrolled student gets a row, as does every student with a
+    submission in the class. Classes are processed in batches so memory
+    stays bounded on large installations.
+    """
+    classes = Class.objects.order_by("id")
+    if class_ids is not None:
+        classes = classes.filter(id__in=class_ids)
+    class_ids = list(classes.values_list("id", flat=True))
+
+    enrollments = Class.students.through.objects
+    for start in range(0, len(class_ids), REBUILD_BATCH_SIZE):
+        end = start + REBUILD_BATCH_SIZE
+        batch = class_ids[start:end]
+        pairs = set(
+            enrollments.filter(class_id__in=batch).values_list("class_id", "student_id")
+        )
+        pairs.update(
+            Submission.objects.filter(
+                assignment__class_assigned_id__in=batch
+            ).values_list("assignment__class_assigned_id", "student_id")
+        )
+        with transaction.atomic():
+            GradebookEntry.objects.filter(classroom_id__in=batch).delete()
+            refresh_gradebook(pairs)
+
+    return len(class_ids)
@@ -0,0 +1,218 @@
+"""
+Writing grades in bulk.
+"""
+
+import csv
+import math
+
+from django.db import transaction
+from django.db.models import Q
+
+from core.events import grade_event, publish, student_channel
+from core.gpa import update_gpas
+from core.gradebook import refresh_gradebook
+from core.models import Grade, Submission
+from core.stats import invalidate_assignment_stats
+
+IMPORT_BATCH_SIZE = 1000
+
+NOT_OWNED_ERROR = "You can only grade assignments you created."
+
+NO_SUBMISSION_ERROR = (
+    "No submission of this student for the assignment in your classes."
+)
+
+INVALID_NUMBER_ERROR = "A valid number is required."
+
+INVALID_INTEGER_ERROR = "A valid integer is required."
+
+REQUIRED_ERROR = "This field is required."
+
+
+def owned_submissions(teacher, condition):
+    """
+    Return a mapping of submission id to (assignment id, class id, student
+    id) of the teacher's submissions matching `condition`.
+    """
+    return {
+        submission_id: (assignment_id, class_id, student_id)
+        for submission_id, assignment_id, class_id, student_id in (
+            Submission.objects.filter(
+                condition, assignment__class_assigned__teacher=teacher
+            ).values_list(
+                "id",
+                "assignment_id",
+                "assignment__class_assigned_id",
+                "student_id",
+            )
+        )
+    }
+
+
+def save_grades(grades, owned):
+    """
+    Upsert a mapping of submission id to grade with one statement.
+
+    `owned` maps each submission id to its (assignment id, class id,
+    student id). bulk_create() sends no signals, so the data derived from
+    grades is refreshed here.
+    """
+    if not grades:
+        return
+    with transaction.atomic():
+        Grade.objects.bulk_create(
+            [
+                Grade(submission_id=submission_id, grade=grade)
+                for submission_id, grade in grades.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["submission"],
+            update_fields=["grade", "modified"],
+        )
+        Submission.objects.filter(id__in=grades).update(is_graded=True)
+        graded = [owned[submission_id] for submission_id in grades]
+        refresh_gradebook(
+            {(class_id, student_id) for _, class_id, student_id in graded}
+        )
+        update_gpas({student_id for _, _, student_id in graded})
+        assignment_ids = {assignment_id for assignment_id, _, _ in graded}
+        transaction.on_commit(lambda: invalidate_assignment_stats(assignment_ids))
+        publish(
+            (
+                student_channel(owned[submission_id][2]),
+                grade_event(submission_id, owned[submission_id][0], grade),
+            )
+            for submission_id, grade in grades.items()
+        )
+
+
+def parse_row(record):
+    """Return the parsed values of a CSV record and the errors of its fields."""
+    row = {"submission": None, "assignment": None, "student": None}
+    errors = {}
+    try:
+        row["grade"] = float(record.get("grade") or "")
+        if not math.isfinite(row["grade"]):
+            raise ValueError(record["grade"])
+    except ValueError:
+        errors["grade"] = [INVALID_NUMBER_ERROR]
+
+    if (record.get("submission") or "").strip():
+        try:
+            row["submission"] = int(record["submission"])
+        except ValueError:
+            errors["submission"] = [INVALID_INTEGER_ERROR]
+        return row, errors
+
+    try:
+        row["assignment"] = int(record.get("assignment") or "")
+    except ValueError:
+        errors["assignment"] = [INVALID_INTEGER_ERROR]
+    row["student"] = (record.get("student") or "").strip()
+    if not row["student"]:
+        errors["student"] = [REQUIRED_ERROR]
+    return row, errors
+
+
+def import_batch(teacher, rows):
+    """
+    Save the grades of a batch of parsed CSV rows, return the number of
+    grades saved and the row errors.
+
+    Submissions given by id and by (assignment, student email) are resolved
+    with one query.
+    """
+    condition = Q(id__in={row["submission"] for row in rows if row["submission"]})
+    keyed = [row for row in rows if not row["submission"]]
+    if keyed:
+        condition |= Q(
+            assignment_id__in={row["assignment"] for row in keyed},
+            student__user__email__in={row["student"] for row in keyed},
+        )
+    owned = {}
+    latest = {}
+    for submission_id, assignment_id, class_id, student_id, email in (
+        Submission.objects.filter(
+            condition, assignment__class_assigned__teacher=teacher
+        )
+        .order_by("submitted_date", "id")
+        .values_list(
+            "id",
+            "assignment_id",
+            "assignment__class_assigned_id",
+            "student_id",
+            "student__user__email",
+        )
+    ):
+        owned[submission_id] = (assignment_id, class_id, student_id)
+        # Later submissions of a student for an assignment win.
+        latest[assignment_id, email] = submission_id
+
+    errors = []
+    grades = {}
+    for row in rows:
+        if row["submission"]:
+            submission_id = row["submission"]
+            if submission_id not in owned:
+                errors.append(
+                    {"row": row["line"], "errors": {"submission": [NOT_OWNED_ERROR]}}
+                )
+                continue
+        else:
+            submission_id = latest.get((row["assignment"], row["student"]))
+            if submission_id is None:
+                errors.append(
+                    {"row": row["line"], "errors": {"student": [NO_SUBMISSION_ERROR]}}
+                )
+                continue
+        # The last grade of a submission in the file wins.
+        grades[submission_id] = row["grade"]
+
+    save_grades(grades, owned)
+    return len(grades), errors
+
+
+def import_grades(teacher, lines, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import grades of the teacher's submissions from CSV lines.
+
+    The CSV has a `grade` column and identifies submissions either by a
+    `submission` id or by `assignment` id and `student` email, in which
+    case the latest submission is graded. Rows are read and saved
+    `batch_size` at a time in one transaction, so memory stays bounded.
+    Returns the number of grades saved and the errors of rejected rows by
+    line number. Raises ValueError if the header misses columns.
+    """
+    reader = csv.DictReader(lines)
+    columns = set(reader.fieldnames or ())
+    if "grade" not in columns or not (
+        "submission" in columns or {"assignment", "student"} <= columns
+    ):
+        raise ValueError(
+            "Expected a grade column and a submission column or assignment "
+            "and student columns."
+        )
+
+    graded = 0
+    errors = []
+    batch = []
+    with transaction.atomic():
+        for record in reader:
+            row, row_errors = parse_row(record)
+            row["line"] = reader.line_num
+            if row_errors:
+                errors.append({"row": reader.line_num, "errors": row_errors})
+            else:
+                batch.append(row)
+            if len(batch) >= batch_size:
+                count, batch_errors = import_batch(teacher, batch)
+                graded += count
+                errors.extend(batch_errors)
+                batch = []
+        if batch:
+            count, batch_errors = import_batch(teacher, batch)
+            graded += count
+            errors.extend(batch_errors)
+
+    errors.sort(key=lambda error: error["row"])
+    return graded, errors
@@ -0,0 +1,45 @@
+"""
+Django command to import grades from a CSV file.
+"""
+
+from django.core.management import BaseCommand, CommandError
+
+from core.grading import IMPORT_BATCH_SIZE, import_grades
+from core.models import Teacher
+
+
+class Command(BaseCommand):
+    """Django command to import the grades of a teacher's submissions."""
+
+    help = "Import grades from a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import.")
+        parser.add_argument(
+            "--teacher",
+            required=True,
+            help="Email of the teacher the graded classes belong to.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=IMPORT_BATCH_SIZE,
+            help="Number of rows saved per batch.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        teacher = Teacher.objects.filter(user__email=options["teacher"]).first()
+        if teacher is None:
+            raise CommandError(f"No teacher with email {options['teacher']}.")
+
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as file:
+                graded, errors = import_grades(teacher, file, options["batch_size"])
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        for error in errors:
+            for field, messages in error["errors"].items():
+                self.stderr.write(f"Row {error['row']}: {field}: {' '.join(messages)}")
+        self.stdout.write(self.style.SUCCESS(f"Imported {graded} grades."))
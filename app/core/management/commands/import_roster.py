@@ -0,0 +1,53 @@
+"""
+Django command to import a class roster from a CSV file.
+"""
+
+from django.core.management import BaseCommand, CommandError
+
+from core.models import Class
+from core.roster import ROSTER_BATCH_SIZE, import_roster
+
+
+class Command(BaseCommand):
+    """Django command to create student accounts and enroll them in a class."""
+
+    help = "Import the students of a class from a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import.")
+        parser.add_argument(
+            "--class",
+            dest="class_id",
+            type=int,
+            required=True,
+            help="Class to enroll the students in.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=ROSTER_BATCH_SIZE,
+            help="Number of rows saved per batch.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        classroom = Class.objects.filter(id=options["class_id"]).first()
+        if classroom is None:
+            raise CommandError(f"No class with id {options['class_id']}.")
+
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as file:
+                created, enrolled, errors = import_roster(
+                    classroom, file, options["batch_size"]
+                )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        for error in errors:
+            for field, messages in error["errors"].items():
+                self.stderr.write(f"Row {error['row']}: {field}: {' '.join(messages)}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {created} accounts and enrolled {enrolled} students."
+            )
+        )
@@ -0,0 +1,18 @@
+"""
+Django command to delete expired sync tombstones.
+"""
+
+from django.core.management import BaseCommand
+
+from core.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    """Django command to delete tombstones no sync token can ask for."""
+
+    help = "Delete tombstones older than the sync token retention."
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        count = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {count} tombstones."))
@@ -0,0 +1,27 @@
+"""
+Django command to rebuild the denormalized gradebook.
+"""
+
+from django.core.management import BaseCommand
+
+from core.gradebook import rebuild_gradebook
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the gradebook from submissions and grades."""
+
+    help = "Rebuild gradebook rows from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--class",
+            dest="class_ids",
+            type=int,
+            nargs="+",
+            help="Only rebuild the gradebook of these classes.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        count = rebuild_gradebook(options["class_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt gradebook of {count} classes."))
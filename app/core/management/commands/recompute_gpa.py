@@ -0,0 +1,26 @@
+"""
+Django command to recompute the GPA of all students.
+"""
+
+from django.core.management import BaseCommand
+
+from core.gpa import BATCH_SIZE, recompute_all_gpas
+
+
+class Command(BaseCommand):
+    """Django command to recompute student GPAs from their grades."""
+
+    help = "Recompute the GPA of every student."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help="Number of students processed per batch.",
+        )
+
+    def handle(self, *args, **options):
+        """Entrypoint for command"""
+        count = recompute_all_gpas(options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Recomputed GPA of {count} students."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.3 on 2026-10-17 02:37
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_submissionupload'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='submission',
+            name='file',
+            field=models.FileField(db_index=True, storage=core.storage.ContentAddressedStorage(), upload_to='submissions/'),
+        ),
+    ]
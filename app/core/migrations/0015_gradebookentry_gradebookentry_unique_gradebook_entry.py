@@ -0,0 +1,34 @@
+# Generated by Django 5.0.3 on 2026-10-17 02:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_alter_submission_file'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradebookEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scores', models.JSONField(default=dict)),
+                ('submitted_count', models.PositiveIntegerField(default=0)),
+                ('graded_count', models.PositiveIntegerField(default=0)),
+                ('average', models.FloatField(null=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('classroom', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.class')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.student')),
+            ],
+            options={
+                'verbose_name_plural': 'Gradebook entries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='gradebookentry',
+            constraint=models.UniqueConstraint(fields=('classroom', 'student'), name='unique_gradebook_entry'),
+        ),
+    ]
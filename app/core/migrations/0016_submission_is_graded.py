@@ -0,0 +1,28 @@
+# Generated by Django 5.0.3 on 2026-10-17 02:45
+
+from django.db import migrations, models
+
+
+def mark_graded_submissions(apps, schema_editor):
+    Submission = apps.get_model('core', 'Submission')
+    Submission.objects.filter(grade__isnull=False).update(is_graded=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_gradebookentry_gradebookentry_unique_gradebook_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='is_graded',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_graded_submissions, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(condition=models.Q(('is_graded', False)), fields=['assignment', 'submitted_date'], name='submission_ungraded_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-17 02:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_submission_is_graded'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['class_assigned', 'due_date'], name='assignment_class_due_idx'),
+        ),
+    ]
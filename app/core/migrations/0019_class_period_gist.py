@@ -0,0 +1,29 @@
+# Generated by Django 5.0.3 on 2026-10-17 09:12
+
+from django.db import migrations
+
+
+def create_period_index(apps, schema_editor):
+    # Range types and GiST are Postgres only, other backends compare the
+    # dates in core.schedule.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX class_period_gist ON core_class "
+            "USING gist (daterange(start_date, end_date, '[]'))"
+        )
+
+
+def drop_period_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS class_period_gist')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_sync_tracking'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_period_index, drop_period_index),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.3 on 2026-10-17 03:54
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_tombstone_teachers(apps, schema_editor):
+    Class = apps.get_model('core', 'Class')
+    Tombstone = apps.get_model('core', 'Tombstone')
+    Tombstone.objects.update(
+        teacher_id=Subquery(
+            Class.objects.filter(id=OuterRef('class_id')).values('teacher_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_course_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='sync_reset',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='teacher',
+            name='sync_reset',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='teacher_id',
+            field=models.BigIntegerField(db_index=True, null=True),
+        ),
+        migrations.RunPython(fill_tombstone_teachers, migrations.RunPython.noop),
+    ]
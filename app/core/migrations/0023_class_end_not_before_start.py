@@ -0,0 +1,17 @@
+# Generated by Django 5.0.3 on 2026-10-17 04:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_sync_resets'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='class',
+            constraint=models.CheckConstraint(check=models.Q(('end_date__gte', models.F('start_date'))), name='class_end_not_before_start'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.0.3 on 2026-10-17 04:20
+
+from django.db import migrations
+
+
+def create_search_trigger(apps, schema_editor):
+    # Kept up to date by the database, so QuerySet.update() and bulk_create()
+    # refresh it too. Other backends do not store search vectors.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE FUNCTION core_course_search_vector() RETURNS trigger AS $$ "
+            "BEGIN "
+            "NEW.search_vector := "
+            "setweight(to_tsvector('english', COALESCE(NEW.name, '')), 'A') || "
+            "setweight(to_tsvector('english', COALESCE(NEW.description, '')), 'B'); "
+            "RETURN NEW; "
+            "END $$ LANGUAGE plpgsql"
+        )
+        schema_editor.execute(
+            "CREATE TRIGGER course_search_vector "
+            "BEFORE INSERT OR UPDATE ON core_course "
+            "FOR EACH ROW EXECUTE FUNCTION core_course_search_vector()"
+        )
+
+
+def drop_search_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP TRIGGER course_search_vector ON core_course")
+        schema_editor.execute("DROP FUNCTION core_course_search_vector()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_class_end_not_before_start'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_trigger, drop_search_trigger),
+    ]
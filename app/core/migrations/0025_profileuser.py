@@ -0,0 +1,24 @@
+# Generated by Django 5.0.3 on 2026-10-17 04:14
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_course_search_trigger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileUser',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('core.user',),
+        ),
+    ]
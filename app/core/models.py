@@ -2,14 +2,21 @@
 Database models.
 """
 
+import os
+import uuid
+
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
     PermissionsMixin,
 )
 
+from core.storage import submission_storage
+
 
 class UserManager(BaseUserManager):
     """Manager for users."""
@@ -48,6 +55,22 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "email"
 
 
+class ProfileUserManager(UserManager):
+    """Manager for users loaded with their teacher and student profiles."""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related("teacher", "student")
+
+
+class ProfileUser(User):
+    """User whose lookups fetch both profiles, see `core.roles`."""
+
+    class Meta:
+        proxy = True
+
+    objects = ProfileUserManager()
+
+
 class Student(models.Model):
     """Represents a student."""
 
@@ -60,6 +83,8 @@ class Student(models.Model):
         decimal_places=2,
         null=True,
     )
+    # Sync tokens older than this must fetch everything, see core.sync.
+    sync_reset = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return str(self.id)
@@ -73,6 +98,8 @@ class Teacher(models.Model):
         on_delete=models.CASCADE,
     )
     degree = models.CharField(max_length=255, null=True)
+    # Sync tokens older than this must fetch everything, see core.sync.
+    sync_reset = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.user.first_name} {self.user.last_name}"
@@ -81,11 +108,34 @@ class Teacher(models.Model):
 class Course(models.Model):
     """Represents a course offered to a student."""
 
+    class Meta:
+        indexes = [
+            # Back the filters and orderings of the course list.
+            models.Index(fields=["author", "id"], name="course_author_id_idx"),
+            models.Index(fields=["author", "name"], name="course_author_name_idx"),
+            models.Index(
+                fields=["author", "modified"], name="course_author_modified_idx"
+            ),
+            models.Index(fields=["name", "id"], name="course_name_idx"),
+            models.Index(fields=["modified", "id"], name="course_modified_idx"),
+            models.Index(fields=["created"], name="course_created_idx"),
+            # Back the catalog search, see core.search.
+            GinIndex(fields=["search_vector"], name="course_search_idx"),
+            GinIndex(
+                fields=["name"],
+                opclasses=["gin_trgm_ops"],
+                name="course_name_trgm_idx",
+            ),
+        ]
+
     author = models.ForeignKey(Teacher, on_delete=models.CASCADE)
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     created = models.DateTimeField(auto_now_add=True)
     modified = models.DateTimeField(auto_now=True)
+    # Weighted lexemes of the name and description, set by a trigger on
+    # Postgres, see migration 0024.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     def __str__(self):
         return self.name
@@ -96,6 +146,13 @@ class Class(models.Model):
 
     class Meta:
         verbose_name_plural = "Classes"
+        constraints = [
+            # The period of a class is indexed as a range, which needs it.
+            models.CheckConstraint(
+                check=models.Q(end_date__gte=models.F("start_date")),
+                name="class_end_not_before_start",
+            ),
+        ]
 
     course = models.ForeignKey(
         Course,
@@ -121,19 +178,68 @@ class Class(models.Model):
 class Assignment(models.Model):
     """Represents an assignment."""
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["class_assigned", "due_date"],
+                name="assignment_class_due_idx",
+            ),
+        ]
+
     class_assigned = models.ForeignKey(Class, on_delete=models.CASCADE)
     title = models.CharField(max_length=255)
     description = models.TextField()
     due_date = models.DateField()
+    modified = models.DateTimeField(auto_now=True, db_index=True)
 
 
 class Submission(models.Model):
     """Represents a submission of an assignment by a student."""
 
+    class Meta:
+        indexes = [
+            # Backs the teachers' grading inbox of ungraded submissions.
+            models.Index(
+                fields=["assignment", "submitted_date"],
+                condition=models.Q(is_graded=False),
+                name="submission_ungraded_idx",
+            ),
+        ]
+
     assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     submitted_date = models.DateTimeField(auto_now_add=True)
-    file = models.FileField(upload_to="submissions/")
+    file = models.FileField(
+        upload_to="submissions/",
+        storage=submission_storage,
+        db_index=True,
+    )
+    # Denormalized from Grade so ungraded submissions can be indexed.
+    is_graded = models.BooleanField(default=False)
+    modified = models.DateTimeField(auto_now=True, db_index=True)
+
+    def save(self, *args, **kwargs):
+        # Storing the file locks its name until the row is committed, so it
+        # cannot be released meanwhile, see core.storage.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class SubmissionUpload(models.Model):
+    """Represents a resumable upload of a submission file in progress."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    assignment = models.ForeignKey(Assignment, on_delete=models.CASCADE)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @property
+    def path(self):
+        """Path of the partially uploaded file."""
+        return os.path.join(settings.SUBMISSION_UPLOAD_DIR, str(self.id))
 
 
 class Grade(models.Model):
@@ -141,6 +247,61 @@ class Grade(models.Model):
 
     submission = models.OneToOneField(Submission, on_delete=models.CASCADE)
     grade = models.FloatField()
+    modified = models.DateTimeField(auto_now=True, db_index=True)
+
+
+class GradebookEntry(models.Model):
+    """
+    Denormalized gradebook row of one student in one class.
+
+    Maintained from `Submission` and `Grade` changes by `core.gradebook`.
+    `scores` maps assignment ids to the grade of the latest graded
+    submission for that assignment.
+    """
+
+    class Meta:
+        verbose_name_plural = "Gradebook entries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["classroom", "student"],
+                name="unique_gradebook_entry",
+            ),
+        ]
+
+    classroom = models.ForeignKey(Class, on_delete=models.CASCADE)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    scores = models.JSONField(default=dict)
+    submitted_count = models.PositiveIntegerField(default=0)
+    graded_count = models.PositiveIntegerField(default=0)
+    average = models.FloatField(null=True)
+    updated = models.DateTimeField(auto_now=True)
+
+
+class Tombstone(models.Model):
+    """
+    Records the deletion of an assignment, submission or grade.
+
+    Lets delta sync clients drop rows they hold. The class, teacher and
+    student the object belonged to are kept as plain ids to decide who may
+    see it, as the rows they point to may be deleted too. Tombstones are
+    pruned after `core.sync.TOMBSTONE_RETENTION`.
+    """
+
+    ASSIGNMENT = "assignment"
+    SUBMISSION = "submission"
+    GRADE = "grade"
+    MODEL_CHOICES = [
+        (ASSIGNMENT, "Assignment"),
+        (SUBMISSION, "Submission"),
+        (GRADE, "Grade"),
+    ]
+
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    class_id = models.BigIntegerField()
+    teacher_id = models.BigIntegerField(null=True, db_index=True)
+    student_id = models.BigIntegerField(null=True)
+    deleted = models.DateTimeField(auto_now_add=True, db_index=True)
 
 
 class PasswordReset(models.Model):
@@ -0,0 +1,33 @@
+"""
+Pagination classes shared by the API apps.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor based pagination ordered on the primary key.
+
+    Pages are fetched with a `WHERE id < <cursor>` seek on the primary key
+    index instead of an OFFSET, so the cost of a page does not grow with
+    the size of the table. Cursors are opaque and handed out as the
+    `next`/`previous` links of the response.
+    """
+
+    ordering = "-id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class InboxPagination(KeysetPagination):
+    """Keyset pagination of submissions, oldest first."""
+
+    ordering = ("submitted_date", "id")
+
+
+class RosterPagination(KeysetPagination):
+    """Keyset pagination of students, in order of their ids."""
+
+    ordering = "id"
@@ -0,0 +1,59 @@
+"""
+Roles of authenticated users.
+
+A user is a teacher or a student through their profile. Profiles are loaded
+with the user by `ProfileJWTAuthentication`, and `RoleMixin` attaches the
+role and profile to the request, so checking them costs no query. Code that
+may run without `RoleMixin`, like serializers, reads them with
+`request_role`.
+"""
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from core.models import ProfileUser
+
+TEACHER = "teacher"
+
+STUDENT = "student"
+
+
+def resolve_role(user):
+    """
+    Return the role of a user and their teacher or student profile, None
+    and None for users with neither.
+    """
+    for role in (TEACHER, STUDENT):
+        profile = getattr(user, role, None)
+        if profile is not None:
+            return role, profile
+    return None, None
+
+
+class ProfileJWTAuthentication(JWTAuthentication):
+    """JWT authentication fetching the user and both profiles in one query."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Users are looked up through `user_model.objects`.
+        self.user_model = ProfileUser
+
+
+def request_role(request):
+    """
+    Return the role and profile of the user of a request, set by `RoleMixin`
+    or resolved and set now for views without it.
+    """
+    if not hasattr(request, "role"):
+        request.role, request.profile = resolve_role(request.user)
+    return request.role, request.profile
+
+
+class RoleMixin:
+    """
+    View mixin setting `request.role` to TEACHER, STUDENT or None and
+    `request.profile` to the matching profile once authenticated.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        request.role, request.profile = resolve_role(request.user)
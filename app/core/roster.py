@@ -0,0 +1,205 @@
+"""
+Importing class rosters.
+"""
+
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+from core.models import Student, User
+
+ROSTER_BATCH_SIZE = 1000
+
+# Below this many passwords a batch is hashed in process, a pool costs more.
+POOL_MIN_PASSWORDS = 16
+
+PASSWORD_MIN_LENGTH = 8
+
+REQUIRED_ERROR = "This field is required."
+
+INVALID_EMAIL_ERROR = "Enter a valid email address."
+
+DUPLICATE_EMAIL_ERROR = "This email appears more than once in the file."
+
+NOT_A_STUDENT_ERROR = "A user with this email exists and is not a student."
+
+CONCURRENT_CREATE_ERROR = (
+    "A user with this email was created meanwhile, import the row again."
+)
+
+SHORT_PASSWORD_ERROR = (
+    f"Ensure this field has at least {PASSWORD_MIN_LENGTH} characters."
+)
+
+
+@lru_cache(maxsize=None)
+def get_hash_pool():
+    """Return the process pool hashing passwords, created on first use."""
+    # Workers are spawned rather than forked, so none inherits the database
+    # connection or open transaction of the request that first hashes in them.
+    return ProcessPoolExecutor(
+        mp_context=multiprocessing.get_context("spawn"), initializer=django.setup
+    )
+
+
+def hash_passwords(passwords):
+    """
+    Hash passwords in the process pool, or in process for small batches.
+
+    Password hashing is deliberately slow and CPU bound, so large batches
+    are spread over every core. A pool broken by a dead worker is replaced
+    and the batch hashed again.
+    """
+    if len(passwords) < POOL_MIN_PASSWORDS:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (4 * (os.cpu_count() or 1)))
+    pool = get_hash_pool()
+    try:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
+    except BrokenProcessPool:
+        pool.shutdown(wait=False)
+        if get_hash_pool() is pool:
+            get_hash_pool.cache_clear()
+    return list(get_hash_pool().map(make_password, passwords, chunksize=chunksize))
+
+
+def parse_row(record):
+    """Return the cleaned values of a CSV record and the errors of its fields."""
+    row = {
+        "email": User.objects.normalize_email((record.get("email") or "").strip()),
+        "first_name": (record.get("first_name") or "").strip(),
+        "last_name": (record.get("last_name") or "").strip(),
+        "password": record.get("password") or None,
+    }
+    errors = {}
+    for field in ("email", "first_name", "last_name"):
+        if not row[field]:
+            errors[field] = [REQUIRED_ERROR]
+    if row["email"]:
+        try:
+            validate_email(row["email"])
+        except ValidationError:
+            errors["email"] = [INVALID_EMAIL_ERROR]
+    if row["password"] is not None and len(row["password"]) < PASSWORD_MIN_LENGTH:
+        errors["password"] = [SHORT_PASSWORD_ERROR]
+    return row, errors
+
+
+def import_batch(classroom, rows):
+    """
+    Create the missing accounts of a batch of rows and enroll them, return
+    the number of accounts created, of students enrolled and the row errors.
+
+    When another import creates some of the accounts first, none of the
+    batch's accounts are created and their rows are reported.
+    """
+    existing = {
+        email: student_id
+        for email, student_id in User.objects.filter(
+            email__in=[row["email"] for row in rows]
+        ).values_list("email", "student__id")
+    }
+
+    errors = []
+    student_ids = []
+    new_rows = []
+    for row in rows:
+        if row["email"] not in existing:
+            new_rows.append(row)
+        elif existing[row["email"]] is None:
+            errors.append(
+                {"row": row["line"], "errors": {"email": [NOT_A_STUDENT_ERROR]}}
+            )
+        else:
+            student_ids.append(existing[row["email"]])
+
+    with_password = [row for row in new_rows if row["password"] is not None]
+    hashed = hash_passwords([row["password"] for row in with_password])
+    for row, password in zip(with_password, hashed):
+        row["password"] = password
+
+    try:
+        with transaction.atomic():
+            users = User.objects.bulk_create(
+                [
+                    User(
+                        email=row["email"],
+                        first_name=row["first_name"],
+                        last_name=row["last_name"],
+                        # Students without a password set one with a password reset.
+                        password=row["password"] or make_password(None),
+                    )
+                    for row in new_rows
+                ]
+            )
+            students = Student.objects.bulk_create(
+                [Student(user=user) for user in users]
+            )
+    except IntegrityError:
+        students = []
+        errors.extend(
+            {"row": row["line"], "errors": {"email": [CONCURRENT_CREATE_ERROR]}}
+            for row in new_rows
+        )
+    student_ids.extend(student.id for student in students)
+
+    if student_ids:
+        classroom.students.add(*student_ids)
+    return len(students), len(student_ids), errors
+
+
+def import_roster(classroom, lines, batch_size=ROSTER_BATCH_SIZE):
+    """
+    Import the students of a class from CSV lines.
+
+    The CSV has `email`, `first_name` and `last_name` columns and an
+    optional `password` column. Missing accounts are created with bulk
+    inserts, their passwords hashed across the process pool, and everyone is
+    enrolled in the class, `batch_size` rows at a time in one transaction.
+    Returns the number of accounts created, of students enrolled and the
+    errors of rejected rows by line number. Raises ValueError if the header
+    misses columns.
+    """
+    reader = csv.DictReader(lines)
+    if not {"email", "first_name", "last_name"} <= set(reader.fieldnames or ()):
+        raise ValueError("Expected email, first_name and last_name columns.")
+
+    created = 0
+    enrolled = 0
+    errors = []
+    batch = []
+    seen = set()
+    with transaction.atomic():
+        for record in reader:
+            row, row_errors = parse_row(record)
+            row["line"] = reader.line_num
+            if not row_errors and row["email"] in seen:
+                row_errors = {"email": [DUPLICATE_EMAIL_ERROR]}
+            if row_errors:
+                errors.append({"row": reader.line_num, "errors": row_errors})
+                continue
+            seen.add(row["email"])
+            batch.append(row)
+            if len(batch) >= batch_size:
+                counts = import_batch(classroom, batch)
+                created += counts[0]
+                enrolled += counts[1]
+                errors.extend(counts[2])
+                batch = []
+        if batch:
+            counts = import_batch(classroom, batch)
+            created += counts[0]
+            enrolled += counts[1]
+            errors.extend(counts[2])
+
+    errors.sort(key=lambda error: error["row"])
+    return created, enrolled, errors
@@ -0,0 +1,87 @@
+"""
+Overlap queries on the date ranges of classes.
+
+On Postgres the `[start_date, end_date]` range of a class is matched with
+range operators served by the `class_period_gist` expression index. Other
+backends compare the start and end dates.
+"""
+
+from collections import defaultdict
+
+from django.contrib.postgres.fields import DateRangeField
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import F, Func, Value
+
+from core.models import Class
+
+
+def use_range_index():
+    return connection.vendor == "postgresql"
+
+
+def period(prefix=""):
+    """Return the date range expression of a class, matching the index."""
+    return Func(
+        F(f"{prefix}start_date"),
+        F(f"{prefix}end_date"),
+        Value("[]"),
+        function="daterange",
+        output_field=DateRangeField(),
+    )
+
+
+def overlapping(queryset, start, end, fields, prefix=""):
+    """
+    Return the `fields` of the rows of a queryset whose class overlaps the
+    dates, `prefix` is the lookup path from the rows to the class.
+    """
+    if use_range_index():
+        return list(
+            queryset.alias(period=period(prefix))
+            .filter(period__overlap=DateRange(start, end, "[]"))
+            .values_list(*fields)
+        )
+    return list(
+        queryset.filter(
+            **{f"{prefix}start_date__lte": end, f"{prefix}end_date__gte": start}
+        ).values_list(*fields)
+    )
+
+
+def overlapping_class_ids(classes, start, end):
+    """Return the ids of the classes of a queryset overlapping the dates."""
+    return [class_id for class_id, in overlapping(classes, start, end, ["id"])]
+
+
+def teacher_conflicts(teacher_id, start, end, exclude=None):
+    """Return the ids of the teacher's other classes overlapping the dates."""
+    classes = Class.objects.filter(teacher_id=teacher_id)
+    if exclude is not None:
+        classes = classes.exclude(id=exclude)
+    return sorted(overlapping_class_ids(classes, start, end))
+
+
+def student_conflicts(student_ids, start, end, exclude=None):
+    """
+    Return a mapping of student id to the ids of their other classes
+    overlapping the dates, for the students that have any.
+    """
+    enrollments = Class.students.through.objects.filter(student_id__in=student_ids)
+    if exclude is not None:
+        enrollments = enrollments.exclude(class_id=exclude)
+    conflicts = defaultdict(list)
+    for student_id, class_id in overlapping(
+        enrollments, start, end, ["student_id", "class_id"], prefix="class__"
+    ):
+        conflicts[student_id].append(class_id)
+    return {student_id: sorted(ids) for student_id, ids in conflicts.items()}
+
+
+def active_classes(classes, day):
+    """Return the classes of a queryset running on a day."""
+    if use_range_index():
+        return classes.alias(period=period()).filter(
+            period__overlap=DateRange(day, day, "[]")
+        )
+    return classes.filter(start_date__lte=day, end_date__gte=day)
@@ -0,0 +1,74 @@
+"""
+Full-text search of the course catalog.
+
+On Postgres the name and description of a course are stored as a weighted
+`tsvector` by a database trigger and matched through a GIN index, and searches without a match fall
+back to trigram similarity of names to tolerate typos. Other backends match
+every word of the search with LIKE.
+"""
+
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import connection
+from django.db.models import CharField, F, FloatField, Q, Value
+
+SEARCH_CONFIG = "english"
+
+SEARCH_MAX_RESULTS = 50
+
+HIGHLIGHT_START = "<mark>"
+
+HIGHLIGHT_STOP = "</mark>"
+
+
+def use_full_text():
+    return connection.vendor == "postgresql"
+
+
+def search_courses(courses, query):
+    """
+    Return the courses of a queryset matching a search, best first.
+
+    Courses are annotated with the `rank` of the match and a `headline`
+    snippet of the description highlighting the matched words.
+    """
+    if not use_full_text():
+        condition = Q()
+        for word in query.split():
+            condition &= Q(name__icontains=word) | Q(description__icontains=word)
+        return courses.filter(condition).annotate(
+            rank=Value(None, output_field=FloatField()),
+            headline=Value(None, output_field=CharField()),
+        )[:SEARCH_MAX_RESULTS]
+
+    search = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+    results = (
+        courses.filter(search_vector=search)
+        .annotate(
+            rank=SearchRank(F("search_vector"), search),
+            headline=SearchHeadline(
+                "description",
+                search,
+                config=SEARCH_CONFIG,
+                start_sel=HIGHLIGHT_START,
+                stop_sel=HIGHLIGHT_STOP,
+            ),
+        )
+        .order_by("-rank", "-id")[:SEARCH_MAX_RESULTS]
+    )
+    if results:
+        return results
+
+    # Nothing matched the words, look for names similar to the search.
+    return (
+        courses.filter(name__trigram_word_similar=query)
+        .annotate(
+            rank=TrigramWordSimilarity(query, "name"),
+            headline=Value(None, output_field=CharField()),
+        )
+        .order_by("-rank", "-id")[:SEARCH_MAX_RESULTS]
+    )
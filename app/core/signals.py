@@ -0,0 +1,321 @@
+"""
+Signal handlers for the core models.
+"""
+
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from core.catalog import bump_catalog_version
+from core.enrollment import invalidate_enrollments
+from core.events import (
+    assignment_event,
+    class_channel,
+    grade_event,
+    publish,
+    student_channel,
+)
+from core.gpa import update_gpas
+from core.gradebook import gradebook_pairs_for_submissions, refresh_gradebook
+from core.models import (
+    Assignment,
+    Class,
+    Course,
+    Grade,
+    Student,
+    Submission,
+    Tombstone,
+    User,
+)
+from core.stats import invalidate_assignment_stats
+from core.storage import lock_stored_name
+from core.sync import reset_sync
+from core.upcoming import (
+    invalidate_upcoming_for_class,
+    invalidate_upcoming_for_students,
+)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_catalog(sender, instance, **kwargs):
+    bump_catalog_version()
+    # Again after the commit, responses cached meanwhile may be stale.
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=User)
+def invalidate_course_authors(sender, instance, created, update_fields, **kwargs):
+    """Catalog responses can expand the names of the authors of courses."""
+    names = {"first_name", "last_name"}
+    if created or update_fields is not None and not names & set(update_fields):
+        return
+    if Course.objects.filter(author__user=instance).exists():
+        invalidate_course_catalog(sender, instance)
+
+
+def release_submission_file(name):
+    """Delete a stored submission file once no submission references it."""
+    if not name:
+        return
+    with transaction.atomic():
+        # Waits for uploads of the same content to commit their row.
+        lock_stored_name(name)
+        if not Submission.objects.filter(file=name).exists():
+            Submission.file.field.storage.delete(name)
+
+
+@receiver(pre_save, sender=Submission)
+def remember_submission_file(sender, instance, **kwargs):
+    """Keep the stored file name so a replaced file can be released."""
+    instance._previous_file = None
+    if instance.pk:
+        instance._previous_file = (
+            Submission.objects.filter(pk=instance.pk)
+            .values_list("file", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Submission)
+def release_replaced_submission_file(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_file", None)
+    if previous and previous != instance.file.name:
+        transaction.on_commit(lambda: release_submission_file(previous))
+
+
+@receiver(post_delete, sender=Submission)
+def release_deleted_submission_file(sender, instance, **kwargs):
+    name = instance.file.name
+    transaction.on_commit(lambda: release_submission_file(name))
+
+
+def schedule_gradebook_refresh(pairs):
+    """Refresh the gradebook rows of the given pairs after the commit."""
+    if pairs:
+        transaction.on_commit(lambda: refresh_gradebook(pairs))
+
+
+@receiver(post_save, sender=Submission)
+def update_gradebook_on_submission_save(sender, instance, **kwargs):
+    schedule_gradebook_refresh(gradebook_pairs_for_submissions([instance.pk]))
+
+
+@receiver(post_delete, sender=Submission)
+def update_on_submission_delete(sender, instance, **kwargs):
+    """Refresh the gradebook row and record a tombstone for sync clients."""
+    # The submission is gone, resolve its class through the assignment.
+    assignment = (
+        Assignment.objects.filter(id=instance.assignment_id)
+        .values_list("class_assigned_id", "class_assigned__teacher_id")
+        .first()
+    )
+    if assignment is None:
+        return
+
+    class_id, teacher_id = assignment
+    schedule_gradebook_refresh({(class_id, instance.student_id)})
+    Tombstone.objects.create(
+        model=Tombstone.SUBMISSION,
+        object_id=instance.pk,
+        class_id=class_id,
+        teacher_id=teacher_id,
+        student_id=instance.student_id,
+    )
+
+
+@receiver(pre_save, sender=Grade)
+def remember_graded_submission(sender, instance, **kwargs):
+    """Keep the graded submission so it can be ungraded if the grade moves."""
+    instance._previous_submission_id = None
+    if instance.pk:
+        instance._previous_submission_id = (
+            Grade.objects.filter(pk=instance.pk)
+            .values_list("submission_id", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Grade)
+def mark_submission_graded(sender, instance, **kwargs):
+    previous = getattr(instance, "_previous_submission_id", None)
+    if previous and previous != instance.submission_id:
+        Submission.objects.filter(id=previous).update(is_graded=False)
+    Submission.objects.filter(id=instance.submission_id).update(is_graded=True)
+
+
+@receiver(post_delete, sender=Grade)
+def mark_submission_ungraded(sender, instance, **kwargs):
+    Submission.objects.filter(id=instance.submission_id).update(is_graded=False)
+
+
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def update_grade_summaries(sender, instance, **kwargs):
+    """
+    Refresh the gradebook row, GPA and statistics the grade counts in, and
+    notify the student of a saved grade or record a tombstone for sync
+    clients when the grade is deleted.
+    """
+    submission = (
+        Submission.objects.filter(id=instance.submission_id)
+        .values_list(
+            "assignment_id",
+            "assignment__class_assigned_id",
+            "assignment__class_assigned__teacher_id",
+            "student_id",
+        )
+        .first()
+    )
+    if submission is None:
+        return
+
+    assignment_id, class_id, teacher_id, student_id = submission
+    if kwargs["signal"] is post_delete:
+        Tombstone.objects.create(
+            model=Tombstone.GRADE,
+            object_id=instance.pk,
+            class_id=class_id,
+            teacher_id=teacher_id,
+            student_id=student_id,
+        )
+    else:
+        publish(
+            [
+                (
+                    student_channel(student_id),
+                    grade_event(instance.submission_id, assignment_id, instance.grade),
+                )
+            ]
+        )
+    schedule_gradebook_refresh({(class_id, student_id)})
+    transaction.on_commit(lambda: update_gpas([student_id]))
+    transaction.on_commit(lambda: invalidate_assignment_stats([assignment_id]))
+
+
+@receiver(post_save, sender=Assignment)
+@receiver(post_delete, sender=Assignment)
+def invalidate_upcoming_on_assignment_change(sender, instance, **kwargs):
+    class_id = instance.class_assigned_id
+    transaction.on_commit(lambda: invalidate_upcoming_for_class(class_id))
+
+
+@receiver(post_save, sender=Assignment)
+def notify_new_assignment(sender, instance, created, **kwargs):
+    """Notify the students of the class of a new assignment."""
+    if created:
+        publish(
+            [(class_channel(instance.class_assigned_id), assignment_event(instance))]
+        )
+
+
+def class_student_ids(class_id):
+    return set(
+        Class.students.through.objects.filter(class_id=class_id).values_list(
+            "student_id", flat=True
+        )
+    )
+
+
+@receiver(pre_save, sender=Assignment)
+def update_on_assignment_move(sender, instance, **kwargs):
+    """
+    Refresh the previous class when an assignment changes class, and resync
+    the viewers who lose it or gain its unchanged submissions.
+    """
+    if instance.pk:
+        previous = (
+            Assignment.objects.filter(pk=instance.pk)
+            .values_list("class_assigned_id", "class_assigned__teacher_id")
+            .first()
+        )
+        if previous is None or previous[0] == instance.class_assigned_id:
+            return
+
+        class_id, teacher_id = previous
+        transaction.on_commit(lambda: invalidate_upcoming_for_class(class_id))
+        new_teacher_id = instance.class_assigned.teacher_id
+        teacher_ids = (
+            [teacher_id, new_teacher_id] if teacher_id != new_teacher_id else []
+        )
+        reset_sync(teacher_ids=teacher_ids, student_ids=class_student_ids(class_id))
+
+
+@receiver(pre_save, sender=Class)
+def reset_sync_on_teacher_change(sender, instance, **kwargs):
+    """Resync both teachers when a class changes teacher."""
+    if instance.pk:
+        previous = (
+            Class.objects.filter(pk=instance.pk)
+            .values_list("teacher_id", flat=True)
+            .first()
+        )
+        if previous is not None and previous != instance.teacher_id:
+            reset_sync(teacher_ids=[previous, instance.teacher_id])
+
+
+@receiver(pre_delete, sender=Class)
+def update_on_class_delete(sender, instance, **kwargs):
+    """
+    Refresh the feeds and cached enrollments and resync the students before
+    the enrollments cascade, as the class's tombstones are no longer
+    visible to them.
+    """
+    student_ids = class_student_ids(instance.pk)
+    reset_sync(student_ids=student_ids)
+    transaction.on_commit(lambda: invalidate_upcoming_for_students(student_ids))
+    invalidate_enrollments(student_ids)
+    transaction.on_commit(lambda: invalidate_enrollments(student_ids))
+
+
+@receiver(m2m_changed, sender=Class.students.through)
+def update_on_enrollment_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Refresh gradebook rows and assignment feeds of changed enrollments, and
+    resync the students whose visible assignments changed.
+    """
+    if action in ("post_add", "post_remove"):
+        if reverse:
+            pairs = {(class_id, instance.pk) for class_id in pk_set}
+        else:
+            pairs = {(instance.pk, student_id) for student_id in pk_set}
+    elif action == "pre_clear":
+        enrollments = sender.objects.filter(
+            **{"student_id" if reverse else "class_id": instance.pk}
+        )
+        pairs = set(enrollments.values_list("class_id", "student_id"))
+    else:
+        return
+    schedule_gradebook_refresh(pairs)
+    student_ids = {student_id for _, student_id in pairs}
+    reset_sync(student_ids=student_ids)
+    transaction.on_commit(lambda: invalidate_upcoming_for_students(student_ids))
+    # Also dropped right away for reads later in this transaction.
+    invalidate_enrollments(student_ids)
+    transaction.on_commit(lambda: invalidate_enrollments(student_ids))
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_student_enrollments(sender, instance, **kwargs):
+    """Never serve cached enrollments of a previous student with the same id."""
+    if kwargs.get("created", True):
+        invalidate_enrollments([instance.pk])
+
+
+@receiver(post_delete, sender=Assignment)
+def record_assignment_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        model=Tombstone.ASSIGNMENT,
+        object_id=instance.pk,
+        class_id=instance.class_assigned_id,
+        teacher_id=Class.objects.filter(id=instance.class_assigned_id)
+        .values_list("teacher_id", flat=True)
+        .first(),
+    )
@@ -0,0 +1,156 @@
+"""
+Grade statistics of assignments.
+"""
+
+import numpy as np
+from django.contrib.postgres.fields import ArrayField
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Aggregate, Avg, Count, FloatField, Max, Min, Q, StdDev
+
+from core.models import Grade
+
+PERCENTILES = [25, 50, 75, 90]
+HISTOGRAM_BUCKETS = 10
+HISTOGRAM_WIDTH = 100 / HISTOGRAM_BUCKETS
+
+STATS_CACHE_TIMEOUT = 5 * 60
+
+
+class PercentileCont(Aggregate):
+    """Postgres `percentile_cont` over an array of fractions."""
+
+    function = "percentile_cont"
+    template = "%(function)s(%(fractions)s) WITHIN GROUP (ORDER BY %(expressions)s)"
+    output_field = ArrayField(FloatField())
+
+    def __init__(self, expression, fractions, **extra):
+        fractions = "ARRAY[{}]::double precision[]".format(
+            ", ".join(str(float(fraction)) for fraction in fractions)
+        )
+        super().__init__(expression, fractions=fractions, **extra)
+
+
+def stats_cache_key(assignment_id):
+    return f"assignment-stats:{assignment_id}"
+
+
+def invalidate_assignment_stats(assignment_ids):
+    """Drop the cached statistics of the given assignments."""
+    cache.delete_many(
+        [stats_cache_key(assignment_id) for assignment_id in assignment_ids]
+    )
+
+
+def histogram_bounds():
+    """Return the (min, max) grade of every histogram bucket."""
+    return [
+        (index * HISTOGRAM_WIDTH, (index + 1) * HISTOGRAM_WIDTH)
+        for index in range(HISTOGRAM_BUCKETS)
+    ]
+
+
+def build_stats(count, mean, std_dev, minimum, maximum, percentiles, histogram):
+    return {
+        "count": count,
+        "mean": mean,
+        "median": percentiles[PERCENTILES.index(50)] if count else None,
+        "std_dev": std_dev,
+        "min": minimum,
+        "max": maximum,
+        "percentiles": {
+            str(percentile): value if count else None
+            for percentile, value in zip(PERCENTILES, percentiles)
+        },
+        "histogram": [
+            {"min": low, "max": high, "count": bucket_count}
+            for (low, high), bucket_count in zip(histogram_bounds(), histogram)
+        ],
+    }
+
+
+def bucket_filter(index):
+    """Return the filter matching the grades of a histogram bucket."""
+    low, high = histogram_bounds()[index]
+    # Out of range grades are counted in the first and last buckets.
+    if index == 0:
+        return Q(grade__lt=high)
+    if index == HISTOGRAM_BUCKETS - 1:
+        return Q(grade__gte=low)
+    return Q(grade__gte=low, grade__lt=high)
+
+
+def stats_in_database(grades):
+    """Compute the statistics with a single Postgres aggregate query."""
+    result = grades.aggregate(
+        count=Count("id"),
+        mean=Avg("grade"),
+        std_dev=StdDev("grade"),
+        minimum=Min("grade"),
+        maximum=Max("grade"),
+        percentiles=PercentileCont(
+            "grade", [percentile / 100 for percentile in PERCENTILES]
+        ),
+        **{
+            f"bucket_{index}": Count("id", filter=bucket_filter(index))
+            for index in range(HISTOGRAM_BUCKETS)
+        },
+    )
+    return build_stats(
+        result["count"],
+        result["mean"],
+        result["std_dev"],
+        result["minimum"],
+        result["maximum"],
+        result["percentiles"] or [None] * len(PERCENTILES),
+        [result[f"bucket_{index}"] for index in range(HISTOGRAM_BUCKETS)],
+    )
+
+
+def stats_with_numpy(grades):
+    """Compute the statistics in NumPy from the fetched grade values."""
+    values = np.fromiter(grades.values_list("grade", flat=True), dtype=float)
+    if not values.size:
+        return build_stats(
+            0,
+            None,
+            None,
+            None,
+            None,
+            [None] * len(PERCENTILES),
+            [0] * HISTOGRAM_BUCKETS,
+        )
+
+    buckets = np.clip(
+        np.floor(values / HISTOGRAM_WIDTH).astype(int), 0, HISTOGRAM_BUCKETS - 1
+    )
+    return build_stats(
+        int(values.size),
+        float(values.mean()),
+        float(values.std()),
+        float(values.min()),
+        float(values.max()),
+        np.percentile(values, PERCENTILES).tolist(),
+        np.bincount(buckets, minlength=HISTOGRAM_BUCKETS).tolist(),
+    )
+
+
+def assignment_grade_stats(assignment_id):
+    """
+    Return the grade statistics of an assignment.
+
+    On Postgres everything is computed by the database in one aggregate
+    query, other backends fetch the grades and use NumPy. The result is
+    cached until a grade of the assignment changes, or for at most
+    `STATS_CACHE_TIMEOUT` seconds where the cache is per process.
+    """
+    key = stats_cache_key(assignment_id)
+    stats = cache.get(key)
+    if stats is None:
+        grades = Grade.objects.filter(submission__assignment_id=assignment_id)
+        if connection.vendor == "postgresql":
+            stats = stats_in_database(grades)
+        else:
+            stats = stats_with_numpy(grades)
+        cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
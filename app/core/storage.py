@@ -0,0 +1,100 @@
+"""
+Content addressed file storage.
+"""
+
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
+
+
+def lock_stored_name(name):
+    """
+    Lock a stored file name until the current transaction ends.
+
+    Saving a file and releasing it both take the lock, so a file is not
+    deleted between storing an existing copy and committing the row that
+    references it. Only Postgres takes the lock.
+    """
+    if connection.vendor == "postgresql" and connection.in_atomic_block:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))", [name]
+            )
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Store files under the SHA-256 digest of their content.
+
+    The digest is computed while the upload is streamed to a temporary
+    file, which is then moved to `<directory>/<ab>/<cd>/<digest><ext>`. When
+    a file with the same digest is already stored the temporary copy is
+    dropped and the existing name is returned, so identical bytes are kept
+    once no matter how many times they are uploaded.
+
+    Several rows may point to the same file, so callers must only delete a
+    file once nothing references it any more, holding `lock_stored_name`.
+    Files must be saved in the transaction that stores their name.
+    """
+
+    def stored_name(self, directory, hexdigest, extension):
+        """Return the name of a file of the given directory and content hash."""
+        return "/".join(
+            part
+            for part in (
+                directory,
+                hexdigest[:2],
+                hexdigest[2:4],
+                hexdigest + extension,
+            )
+            if part
+        )
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is only known once the content is hashed in _save(),
+        # drop an extension the hashed name would not fit in the column with.
+        if max_length is not None:
+            root, extension = os.path.splitext(name)
+            length = len(
+                self.stored_name(os.path.dirname(name), "0" * 64, extension.lower())
+            )
+            if length > max_length:
+                return root
+        return name
+
+    def _save(self, name, content):
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        os.makedirs(self.path(directory), exist_ok=True)
+
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.path(directory), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+
+            hexdigest = digest.hexdigest()
+            name = self.stored_name(directory, hexdigest, extension)
+            full_path = self.path(name)
+
+            lock_stored_name(name)
+            if os.path.exists(full_path):
+                # Same content is already stored, keep the existing copy.
+                return name
+
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.replace(temp_path, full_path)
+            if self.file_permissions_mode is not None:
+                os.chmod(full_path, self.file_permissions_mode)
+            return name
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+submission_storage = ContentAddressedStorage()
@@ -0,0 +1,118 @@
+"""
+Tests for the cached enrollment membership.
+"""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from core import models
+from core.enrollment import (
+    LocalLRU,
+    enrolled_class_ids,
+    is_enrolled,
+    load_enrolled_class_ids,
+    local_cache,
+)
+
+
+class EnrollmentCacheTests(TestCase):
+    """Test enrollment lookups are cached and invalidated."""
+
+    def setUp(self):
+        cache.clear()
+        user_model = get_user_model()
+        teacher = models.Teacher.objects.create(
+            user=user_model.objects.create_user("teacher@example.com", "pass123")
+        )
+        course = models.Course.objects.create(author=teacher, name="Course")
+        self.classes = [
+            models.Class.objects.create(
+                course=course,
+                teacher=teacher,
+                start_date="2024-01-01",
+                end_date="2024-12-31",
+            )
+            for _ in range(2)
+        ]
+        self.student = models.Student.objects.create(
+            user=user_model.objects.create_user("student@example.com", "pass123")
+        )
+        self.classes[0].students.add(self.student)
+
+    def test_enrollments_cached(self):
+        """Test repeated lookups do not query the database."""
+        with self.assertNumQueries(1):
+            self.assertTrue(is_enrolled(self.student.id, self.classes[0].id))
+            self.assertFalse(is_enrolled(self.student.id, self.classes[1].id))
+
+    def test_enrollments_invalidated_on_change(self):
+        """Test enrollment changes from either side drop the cached classes."""
+        enrolled_class_ids(self.student.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classes[1].students.add(self.student)
+        self.assertEqual(
+            enrolled_class_ids(self.student.id),
+            {self.classes[0].id, self.classes[1].id},
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.classes_enrolled.clear()
+        self.assertEqual(enrolled_class_ids(self.student.id), set())
+
+    def test_enrollments_invalidated_on_class_delete(self):
+        """Test deleting a class drops the cached enrollments of its students."""
+        enrolled_class_ids(self.student.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.classes[0].delete()
+
+        self.assertEqual(enrolled_class_ids(self.student.id), set())
+
+    def test_lookup_racing_change_not_cached(self):
+        """Test a lookup that read before a change does not cache its result."""
+
+        def enroll_after_read(student_id):
+            class_ids = load_enrolled_class_ids(student_id)
+            with self.captureOnCommitCallbacks(execute=True):
+                self.classes[1].students.add(self.student)
+            return class_ids
+
+        with mock.patch(
+            "core.enrollment.load_enrolled_class_ids", side_effect=enroll_after_read
+        ):
+            enrolled_class_ids(self.student.id)
+        # As another process whose local entry expired would see it.
+        local_cache.delete_many(list(local_cache.entries))
+
+        self.assertEqual(
+            enrolled_class_ids(self.student.id),
+            {self.classes[0].id, self.classes[1].id},
+        )
+
+
+class LocalLRUTests(SimpleTestCase):
+    """Test the in-process LRU."""
+
+    def test_least_recently_used_evicted(self):
+        """Test the least recently used entry is evicted when full."""
+        lru = LocalLRU(2, 60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+
+        self.assertEqual((lru.get("a"), lru.get("b"), lru.get("c")), (1, None, 3))
+
+    @mock.patch("core.enrollment.time.monotonic")
+    def test_entries_expire(self, monotonic):
+        """Test entries are dropped after the timeout."""
+        monotonic.return_value = 100
+        lru = LocalLRU(2, 10)
+        lru.set("a", 1)
+
+        monotonic.return_value = 111
+        self.assertIsNone(lru.get("a"))
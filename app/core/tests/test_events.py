@@ -0,0 +1,99 @@
+"""
+Tests for real-time event fan-out.
+"""
+
+import asyncio
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from core import models
+from core.events import InProcessBroker, class_channel, get_broker, student_channel
+
+
+class InProcessBrokerTests(SimpleTestCase):
+    """Test delivering events to subscribers of the process."""
+
+    async def test_publish_to_subscribers(self):
+        """Test events only reach the subscribers of their channel."""
+        broker = InProcessBroker()
+        with broker.subscribe(["a", "b"]) as first, broker.subscribe(["b"]) as second:
+            broker.publish([("a", {"n": 1}), ("b", {"n": 2}), ("c", {"n": 3})])
+
+            self.assertEqual(await first.get(1), {"n": 1})
+            self.assertEqual(await first.get(1), {"n": 2})
+            self.assertEqual(await second.get(1), {"n": 2})
+            with self.assertRaises(asyncio.TimeoutError):
+                await second.get(0.01)
+
+        self.assertEqual(broker.subscribers, {})
+
+
+class EventSignalTests(TestCase):
+    """Test events are published when grades and assignments are saved."""
+
+    def setUp(self):
+        user_model = get_user_model()
+        teacher = models.Teacher.objects.create(
+            user=user_model.objects.create_user("teacher@example.com", "pass123")
+        )
+        course = models.Course.objects.create(author=teacher, name="Course")
+        self.classroom = models.Class.objects.create(
+            course=course,
+            teacher=teacher,
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+        )
+        self.student = models.Student.objects.create(
+            user=user_model.objects.create_user("student@example.com", "pass123")
+        )
+        patcher = mock.patch.object(get_broker(), "publish")
+        self.publish = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_assignment_created_event(self):
+        """Test a new assignment is published to its class once committed."""
+        with self.captureOnCommitCallbacks(execute=True):
+            assignment = models.Assignment.objects.create(
+                class_assigned=self.classroom,
+                title="Homework",
+                description="Description",
+                due_date="2024-09-30",
+            )
+            self.publish.assert_not_called()
+
+        channel, event = self.publish.call_args.args[0][0]
+        self.assertEqual(channel, class_channel(self.classroom.id))
+        self.assertEqual(event["type"], "assignment")
+        self.assertEqual(event["id"], assignment.id)
+
+    def test_grade_saved_event(self):
+        """Test a saved grade is published to the student."""
+        assignment = models.Assignment.objects.create(
+            class_assigned=self.classroom,
+            title="Homework",
+            description="Description",
+            due_date="2024-09-30",
+        )
+        submission = models.Submission.objects.create(
+            assignment=assignment, student=self.student, file="submissions/a.txt"
+        )
+        self.publish.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Grade.objects.create(submission=submission, grade=88.0)
+
+        self.publish.assert_called_once_with(
+            [
+                (
+                    student_channel(self.student.id),
+                    {
+                        "type": "grade",
+                        "submission": submission.id,
+                        "assignment": assignment.id,
+                        "grade": 88.0,
+                    },
+                )
+            ]
+        )
@@ -0,0 +1,84 @@
+"""
+Tests for GPA computation.
+"""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core import models
+from core.gpa import compute_gpas
+
+
+class GPATests(TestCase):
+    """Test computing student GPAs from grades."""
+
+    def setUp(self):
+        user_model = get_user_model()
+        teacher = models.Teacher.objects.create(
+            user=user_model.objects.create_user("teacher@example.com", "pass123")
+        )
+        course = models.Course.objects.create(author=teacher, name="Course")
+        self.classroom = models.Class.objects.create(
+            course=course,
+            teacher=teacher,
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+        )
+        self.students = [
+            models.Student.objects.create(
+                user=user_model.objects.create_user(f"s{i}@example.com", "pass123")
+            )
+            for i in range(2)
+        ]
+
+    def grade(self, student, grade):
+        """Create a graded submission for the student."""
+        assignment = models.Assignment.objects.create(
+            class_assigned=self.classroom,
+            title="Homework",
+            description="Description",
+            due_date="2024-09-30",
+        )
+        submission = models.Submission.objects.create(
+            assignment=assignment, student=student, file="submissions/a.txt"
+        )
+        return models.Grade.objects.create(submission=submission, grade=grade)
+
+    def test_compute_gpas(self):
+        """Test GPAs are the average grade points of each student."""
+        self.grade(self.students[0], 95.0)
+        self.grade(self.students[0], 85.0)
+
+        gpas = compute_gpas([student.id for student in self.students])
+
+        self.assertEqual(
+            gpas, {self.students[0].id: Decimal("3.5"), self.students[1].id: None}
+        )
+
+    def test_gpa_updated_when_grade_changes(self):
+        """Test a student's GPA follows changes to their grades."""
+        with self.captureOnCommitCallbacks(execute=True):
+            grade = self.grade(self.students[0], 91.0)
+        self.students[0].refresh_from_db()
+        self.assertEqual(self.students[0].gpa, Decimal("3.70"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            grade.delete()
+        self.students[0].refresh_from_db()
+        self.assertIsNone(self.students[0].gpa)
+
+    def test_recompute_gpa_command(self):
+        """Test the command recomputes the GPA of every student."""
+        self.grade(self.students[0], 75.0)
+        self.grade(self.students[1], 50.0)
+
+        call_command("recompute_gpa", batch_size=1, stdout=StringIO())
+
+        self.students[0].refresh_from_db()
+        self.students[1].refresh_from_db()
+        self.assertEqual(self.students[0].gpa, Decimal("2.00"))
+        self.assertEqual(self.students[1].gpa, Decimal("0.00"))
@@ -0,0 +1,115 @@
+"""
+Tests for importing grades.
+"""
+
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core import models
+from core.grading import import_grades
+
+
+class ImportGradesTests(TestCase):
+    """Test importing grades from CSV."""
+
+    def setUp(self):
+        user_model = get_user_model()
+        self.teacher = models.Teacher.objects.create(
+            user=user_model.objects.create_user("teacher@example.com", "pass123")
+        )
+        course = models.Course.objects.create(author=self.teacher, name="Course")
+        classroom = models.Class.objects.create(
+            course=course,
+            teacher=self.teacher,
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+        )
+        self.assignment = models.Assignment.objects.create(
+            class_assigned=classroom,
+            title="Homework",
+            description="Description",
+            due_date="2024-09-30",
+        )
+        self.submissions = [
+            models.Submission.objects.create(
+                assignment=self.assignment,
+                student=models.Student.objects.create(
+                    user=user_model.objects.create_user(f"s{i}@example.com", "pass")
+                ),
+                file="submissions/a.txt",
+            )
+            for i in range(5)
+        ]
+
+    def grade_lines(self, rows):
+        """Return CSV lines grading the first rows students."""
+        return ["student,assignment,grade"] + [
+            f"s{i}@example.com,{self.assignment.id},{90 - i}" for i in range(rows)
+        ]
+
+    def count_import_queries(self, rows, batch_size):
+        """Return the number of queries of an import, which is rolled back."""
+        with CaptureQueriesContext(connection) as queries:
+            try:
+                with transaction.atomic():
+                    import_grades(self.teacher, self.grade_lines(rows), batch_size)
+                    raise DatabaseError("Roll back the import.")
+            except DatabaseError:
+                pass
+        return len(queries)
+
+    def test_import_in_batches(self):
+        """Test rows are resolved and saved with a few queries per batch."""
+        one_batch = self.count_import_queries(2, batch_size=2)
+        # A batch costs the same number of queries whatever its size.
+        self.assertEqual(self.count_import_queries(4, batch_size=4), one_batch)
+        per_batch = self.count_import_queries(4, batch_size=2) - one_batch
+        self.assertEqual(
+            self.count_import_queries(5, batch_size=2), one_batch + 2 * per_batch
+        )
+
+        graded, errors = import_grades(self.teacher, self.grade_lines(5), batch_size=2)
+
+        self.assertEqual((graded, errors), (5, []))
+        self.assertEqual(
+            list(
+                models.Grade.objects.order_by("submission").values_list(
+                    "grade", flat=True
+                )
+            ),
+            [90.0, 89.0, 88.0, 87.0, 86.0],
+        )
+        self.assertFalse(models.Submission.objects.filter(is_graded=False).exists())
+
+    def test_moved_grade_ungrades_previous_submission(self):
+        """Test moving a grade to another submission updates both flags."""
+        first, second = self.submissions[:2]
+        grade = models.Grade.objects.create(submission=first, grade=80)
+
+        grade.submission = second
+        grade.save()
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertFalse(first.is_graded)
+        self.assertTrue(second.is_graded)
+
+    def test_import_grades_command(self):
+        """Test the command imports a CSV file."""
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write(f"submission,grade\n{self.submissions[0].id},75\n")
+            file.flush()
+            stdout = StringIO()
+
+            call_command(
+                "import_grades", file.name, teacher="teacher@example.com", stdout=stdout
+            )
+
+        self.assertIn("Imported 1 grades.", stdout.getvalue())
+        self.assertEqual(self.submissions[0].grade.grade, 75.0)
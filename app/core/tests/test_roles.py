@@ -0,0 +1,61 @@
+"""
+Tests for the roles of authenticated users.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core import models
+from core.roles import (
+    STUDENT,
+    TEACHER,
+    ProfileJWTAuthentication,
+    request_role,
+    resolve_role,
+)
+
+
+class ProfileJWTAuthenticationTests(TestCase):
+    """Test users are authenticated with their profiles."""
+
+    def setUp(self):
+        user_model = get_user_model()
+        self.teacher = models.Teacher.objects.create(
+            user=user_model.objects.create_user("teacher@example.com", "pass123")
+        )
+        self.student = models.Student.objects.create(
+            user=user_model.objects.create_user("student@example.com", "pass123")
+        )
+        self.other = user_model.objects.create_user("other@example.com", "pass123")
+        self.authentication = ProfileJWTAuthentication()
+
+    def authenticate(self, user):
+        return self.authentication.get_user(AccessToken.for_user(user))
+
+    def test_role_resolved_with_one_query(self):
+        """Test the user and both profiles are fetched together."""
+        for user, role, profile in [
+            (self.teacher.user, TEACHER, self.teacher),
+            (self.student.user, STUDENT, self.student),
+            (self.other, None, None),
+        ]:
+            with self.assertNumQueries(1):
+                self.assertEqual(resolve_role(self.authenticate(user)), (role, profile))
+
+    def test_inactive_user_rejected(self):
+        """Test inactive users cannot authenticate."""
+        self.other.is_active = False
+        self.other.save()
+
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(self.other)
+
+    def test_request_role_without_role_mixin(self):
+        """Test the role of a request no view resolved is resolved on demand."""
+        request = RequestFactory().get("/")
+        request.user = self.teacher.user
+
+        self.assertEqual(request_role(request), (TEACHER, self.teacher))
+        self.assertEqual(request.profile, self.teacher)
@@ -0,0 +1,95 @@
+"""
+Tests for importing class rosters.
+"""
+
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from core import models
+from core.roster import (
+    CONCURRENT_CREATE_ERROR,
+    get_hash_pool,
+    hash_passwords,
+    import_roster,
+)
+
+
+class ImportRosterTests(TestCase):
+    """Test importing the students of a class from CSV."""
+
+    def setUp(self):
+        teacher = models.Teacher.objects.create(
+            user=get_user_model().objects.create_user("teacher@example.com", "pass")
+        )
+        course = models.Course.objects.create(author=teacher, name="Course")
+        self.classroom = models.Class.objects.create(
+            course=course,
+            teacher=teacher,
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+        )
+
+    @mock.patch("core.roster.POOL_MIN_PASSWORDS", 2)
+    def test_hash_passwords_in_pool(self):
+        """Test passwords hashed in the process pool can be checked."""
+        hashed = hash_passwords(["password1", "password2"])
+
+        user = get_user_model()(password=hashed[1])
+        self.assertTrue(user.check_password("password2"))
+
+    @mock.patch("core.roster.POOL_MIN_PASSWORDS", 2)
+    def test_hash_pool_replaced_when_broken(self):
+        """Test a pool broken by a dead worker is replaced."""
+        hash_passwords(["password1", "password2"])
+        pool = get_hash_pool()
+        for process in list(pool._processes.values()):
+            process.kill()
+
+        hashed = hash_passwords(["password1", "password2"])
+
+        self.assertIsNot(get_hash_pool(), pool)
+        user = get_user_model()(password=hashed[0])
+        self.assertTrue(user.check_password("password1"))
+
+    def test_concurrently_created_accounts_reported(self):
+        """Test rows whose account another import created first are reported."""
+        lines = ["email,first_name,last_name", "s0@example.com,First,Last"]
+        real_bulk_create = models.User.objects.bulk_create
+
+        def create_first(users):
+            # Stands in for another import creating the account between
+            # the lookup and the insert.
+            get_user_model().objects.create_user("s0@example.com")
+            return real_bulk_create(users)
+
+        with mock.patch.object(models.User.objects, "bulk_create", create_first):
+            created, enrolled, errors = import_roster(self.classroom, lines)
+
+        self.assertEqual((created, enrolled), (0, 0))
+        self.assertEqual(
+            errors, [{"row": 2, "errors": {"email": [CONCURRENT_CREATE_ERROR]}}]
+        )
+
+    def test_import_roster_command(self):
+        """Test the command imports a CSV file in batches."""
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write("email,first_name,last_name\n")
+            file.writelines(f"s{i}@example.com,First,Last\n" for i in range(3))
+            file.flush()
+            stdout = StringIO()
+
+            call_command(
+                "import_roster",
+                file.name,
+                class_id=self.classroom.id,
+                batch_size=2,
+                stdout=stdout,
+            )
+
+        self.assertIn("Created 3 accounts and enrolled 3 students.", stdout.getvalue())
+        self.assertEqual(self.classroom.students.count(), 3)
@@ -0,0 +1,81 @@
+"""
+Tests for the class schedule overlap queries.
+"""
+
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase
+
+from core import models
+from core.schedule import (
+    active_classes,
+    student_conflicts,
+    teacher_conflicts,
+)
+
+
+class ScheduleConflictTests(TestCase):
+    """Test overlap queries on classes."""
+
+    def setUp(self):
+        user_model = get_user_model()
+        self.teacher = models.Teacher.objects.create(
+            user=user_model.objects.create_user("teacher@example.com", "pass123")
+        )
+        course = models.Course.objects.create(author=self.teacher, name="Course")
+        self.student = models.Student.objects.create(
+            user=user_model.objects.create_user("student@example.com", "pass123")
+        )
+        start = date(2024, 1, 1)
+        self.classes = []
+        for week in range(4):
+            classroom = models.Class.objects.create(
+                course=course,
+                teacher=self.teacher,
+                start_date=start + timedelta(weeks=week),
+                end_date=start + timedelta(weeks=week, days=6),
+            )
+            classroom.students.add(self.student)
+            self.classes.append(classroom)
+
+    def test_teacher_conflicts(self):
+        """Test the teacher's classes overlapping the dates are returned."""
+        conflicts = teacher_conflicts(
+            self.teacher.id,
+            date(2024, 1, 7),
+            date(2024, 1, 8),
+            exclude=self.classes[0].id,
+        )
+
+        self.assertEqual(conflicts, [self.classes[1].id])
+
+    def test_student_conflicts(self):
+        """Test the students' classes overlapping the dates are returned."""
+        conflicts = student_conflicts(
+            [self.student.id], date(2024, 1, 10), date(2024, 1, 20)
+        )
+
+        self.assertEqual(
+            conflicts, {self.student.id: [self.classes[1].id, self.classes[2].id]}
+        )
+        self.assertEqual(
+            student_conflicts([self.student.id], date(2025, 1, 1), date(2025, 2, 1)), {}
+        )
+
+    def test_active_classes(self):
+        """Test the classes running on a day are returned."""
+        classes = active_classes(models.Class.objects.all(), date(2024, 1, 28))
+
+        self.assertEqual(list(classes), [self.classes[3]])
+
+    def test_end_before_start_rejected(self):
+        """Test a class cannot end before it starts."""
+        with self.assertRaises(IntegrityError):
+            models.Class.objects.create(
+                course=self.classes[0].course,
+                teacher=self.classes[0].teacher,
+                start_date=date(2024, 2, 1),
+                end_date=date(2024, 1, 31),
+            )
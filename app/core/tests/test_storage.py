@@ -0,0 +1,119 @@
+"""
+Tests for content addressed submission storage.
+"""
+
+import hashlib
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from core import models
+from core.storage import submission_storage
+
+
+def create_submission(assignment, student, content=b"file content"):
+    """Create and return a submission of the given content."""
+    return models.Submission.objects.create(
+        assignment=assignment,
+        student=student,
+        file=SimpleUploadedFile("testfile.txt", content, content_type="text/plain"),
+    )
+
+
+class ContentAddressedStorageTests(TestCase):
+    """Test submission files are stored by content."""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        user_model = get_user_model()
+        teacher = models.Teacher.objects.create(
+            user=user_model.objects.create_user("teacher@example.com", "pass123")
+        )
+        course = models.Course.objects.create(author=teacher, name="Course")
+        classroom = models.Class.objects.create(
+            course=course,
+            teacher=teacher,
+            start_date="2024-01-01",
+            end_date="2024-12-31",
+        )
+        self.assignment = models.Assignment.objects.create(
+            class_assigned=classroom,
+            title="Homework",
+            description="Description",
+            due_date="2024-09-30",
+        )
+        self.student = models.Student.objects.create(
+            user=user_model.objects.create_user("student@example.com", "pass123")
+        )
+
+    def test_file_named_by_content_hash(self):
+        """Test a stored file is named by the SHA-256 of its content."""
+        submission = create_submission(self.assignment, self.student)
+
+        digest = hashlib.sha256(b"file content").hexdigest()
+        self.assertEqual(
+            submission.file.name,
+            f"submissions/{digest[:2]}/{digest[2:4]}/{digest}.txt",
+        )
+        with submission.file.open("rb") as f:
+            self.assertEqual(f.read(), b"file content")
+
+    def test_identical_content_stored_once(self):
+        """Test identical uploads share one stored file."""
+        first = create_submission(self.assignment, self.student)
+        second = create_submission(self.assignment, self.student)
+        other = create_submission(self.assignment, self.student, b"other content")
+
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertNotEqual(first.file.name, other.file.name)
+
+    def test_file_deleted_with_last_reference(self):
+        """Test a shared file is only deleted with its last submission."""
+        with self.captureOnCommitCallbacks(execute=True):
+            first = create_submission(self.assignment, self.student)
+            second = create_submission(self.assignment, self.student)
+        name = first.file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(submission_storage.exists(name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(submission_storage.exists(name))
+
+    def test_long_extension_dropped(self):
+        """Test an extension the hashed name cannot fit with is dropped."""
+        submission = models.Submission.objects.create(
+            assignment=self.assignment,
+            student=self.student,
+            file=SimpleUploadedFile("notes.2024-spring-final-v2", b"file content"),
+        )
+
+        digest = hashlib.sha256(b"file content").hexdigest()
+        self.assertTrue(submission.file.name.endswith(digest))
+        self.assertLessEqual(len(submission.file.name), 100)
+
+    def test_file_locked_while_saved_and_released(self):
+        """Test saving and releasing a file lock its name."""
+        with mock.patch("core.storage.connection") as connection:
+            connection.vendor = "postgresql"
+            connection.in_atomic_block = True
+            with self.captureOnCommitCallbacks(execute=True):
+                submission = create_submission(self.assignment, self.student)
+                submission.delete()
+
+        name = submission.file.name
+        execute = connection.cursor().__enter__().execute
+        self.assertEqual(
+            [call.args[1] for call in execute.call_args_list], [[name], [name]]
+        )
+        self.assertFalse(submission_storage.exists(name))
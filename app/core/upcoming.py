@@ -0,0 +1,62 @@
+"""
+Per-student cache of the upcoming assignments feed.
+"""
+
+import uuid
+
+from django.core.cache import cache
+
+from core.models import Class
+
+UPCOMING_TIMEOUT = 24 * 60 * 60
+
+
+def upcoming_cache_key(student_id):
+    """Key of the version shared by every cached feed of a student."""
+    return f"upcoming-assignments:{student_id}"
+
+
+def feed_cache_key(version, day, days):
+    return f"upcoming-assignments:{version}:{day.isoformat()}:{days}"
+
+
+def get_cached_feed(student_id, day, days):
+    """
+    Return the version of a student's feeds and the cached feed for a day
+    and window, or None.
+
+    The version is ensured before the feed is computed, so a feed computed
+    while an invalidation lands is cached under the dropped version.
+    """
+    key = upcoming_cache_key(student_id)
+    cache.add(key, uuid.uuid4().hex, UPCOMING_TIMEOUT)
+    version = cache.get(key)
+    if version is None:
+        return None, None
+    return version, cache.get(feed_cache_key(version, day, days))
+
+
+def set_cached_feed(version, day, days, feed):
+    """
+    Cache the feed of a student for a day and window under the version
+    returned by get_cached_feed().
+
+    Each window has its own key under the student's version, so concurrent
+    requests never overwrite each other's windows.
+    """
+    if version is not None:
+        cache.set(feed_cache_key(version, day, days), feed, UPCOMING_TIMEOUT)
+
+
+def invalidate_upcoming_for_students(student_ids):
+    """Drop the cached feeds of the given students."""
+    cache.delete_many([upcoming_cache_key(student_id) for student_id in student_ids])
+
+
+def invalidate_upcoming_for_class(class_id):
+    """Drop the cached feeds of every student enrolled in a class."""
+    invalidate_upcoming_for_students(
+        Class.students.through.objects.filter(class_id=class_id).values_list(
+            "student_id", flat=True
+        )
+    )
@@ -4,7 +4,27 @@ Serializer for course API.
 
 from rest_framework import serializers
 
-from core.models import Course
+from core.models import Course, Teacher
+from core.roles import request_role
+
+# Course list orderings and the columns they sort on, ties broken by id.
+COURSE_ORDERINGS = {
+    "name": ["name", "id"],
+    "-name": ["-name", "-id"],
+    "modified": ["modified", "id"],
+    "-modified": ["-modified", "-id"],
+}
+
+
+class CourseAuthorSerializer(serializers.ModelSerializer):
+    """Serializer for the expanded author of a course."""
+
+    first_name = serializers.CharField(source="user.first_name")
+    last_name = serializers.CharField(source="user.last_name")
+
+    class Meta:
+        model = Teacher
+        fields = ["id", "first_name", "last_name"]
 
 
 class CourseSerializer(serializers.ModelSerializer):
@@ -12,5 +32,44 @@ class CourseSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Course
-        fields = ["id", "name", "description", "created", "modified"]
-        read_only_fields = ["id"]
+        fields = ["id", "author", "name", "description", "created", "modified"]
+        read_only_fields = ["id", "author"]
+
+    def get_fields(self):
+        """Expand the author when requested with `?expand=author`."""
+        fields = super().get_fields()
+        if "author" in self.context.get("expand", ()):
+            fields["author"] = CourseAuthorSerializer(read_only=True)
+        return fields
+
+
+class CourseSearchSerializer(CourseSerializer):
+    """Serializer for courses matching a catalog search."""
+
+    rank = serializers.FloatField(read_only=True)
+    headline = serializers.CharField(read_only=True)
+
+    class Meta(CourseSerializer.Meta):
+        fields = CourseSerializer.Meta.fields + ["rank", "headline"]
+
+
+class CourseFilterSerializer(serializers.Serializer):
+    """Serializer for the query parameters of the course list."""
+
+    author = serializers.CharField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+    modified_after = serializers.DateTimeField(required=False)
+    modified_before = serializers.DateTimeField(required=False)
+    ordering = serializers.ChoiceField(choices=list(COURSE_ORDERINGS), required=False)
+    expand = serializers.ChoiceField(choices=["author"], required=False)
+
+    def validate_author(self, value):
+        """Accept a teacher id, or `me` for the courses of the teacher."""
+        if value == "me":
+            _, profile = request_role(self.context["request"])
+            return profile.id
+        try:
+            return int(value)
+        except ValueError:
+            raise serializers.ValidationError("A valid integer or me is required.")
@@ -2,12 +2,16 @@
 Tests for course API.
 """
 
+from datetime import datetime, timezone
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
 from core.models import Course, Teacher
 from course.serializers import CourseSerializer
@@ -60,6 +64,7 @@ class TeacherCourseAPITests(TestCase):
     """Test authenticated Teacher API requests."""
 
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = create_user()
         self.teacher = create_teacher(user=self.user)
@@ -103,6 +108,162 @@ class TeacherCourseAPITests(TestCase):
             ).data,
         )
 
+    def test_search_courses(self):
+        """Test searching courses matches every word of the name or description."""
+        algebra = create_course(
+            author=self.teacher,
+            name="Linear Algebra",
+            description="Vectors and matrices.",
+        )
+        create_course(author=self.teacher, name="Algebra for Kids", description="")
+        create_course(author=self.teacher, name="Biology", description="Cells.")
+
+        res = self.client.get(COURSES_URL, {"q": "algebra matrices"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([course["id"] for course in res.data], [algebra.id])
+        self.assertIn("rank", res.data[0])
+        self.assertIn("headline", res.data[0])
+
+    def test_empty_search_lists_catalog(self):
+        """Test a blank search lists every course."""
+        create_course(author=self.teacher)
+
+        res = self.client.get(COURSES_URL, {"q": " "})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data, CourseSerializer(Course.objects.order_by("-id"), many=True).data
+        )
+
+    def test_filter_my_courses(self):
+        """Test filtering courses by author, `me` being the teacher."""
+        other_teacher = create_teacher(user=create_user(email="user2@example.com"))
+        mine = create_course(author=self.teacher)
+        theirs = create_course(author=other_teacher)
+
+        res = self.client.get(COURSES_URL, {"author": "me"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([course["id"] for course in res.data], [mine.id])
+        self.assertEqual(res.data[0]["author"], self.teacher.id)
+        res = self.client.get(COURSES_URL, {"author": other_teacher.id})
+        self.assertEqual([course["id"] for course in res.data], [theirs.id])
+
+    def test_filter_modified_since(self):
+        """Test filtering courses modified in a range."""
+        old = create_course(author=self.teacher)
+        new = create_course(author=self.teacher)
+        Course.objects.filter(id=old.id).update(
+            modified=datetime(2024, 1, 1, tzinfo=timezone.utc)
+        )
+
+        res = self.client.get(COURSES_URL, {"modified_after": "2024-06-01T00:00Z"})
+        self.assertEqual([course["id"] for course in res.data], [new.id])
+        res = self.client.get(COURSES_URL, {"modified_before": "2024-06-01T00:00Z"})
+        self.assertEqual([course["id"] for course in res.data], [old.id])
+
+    def test_order_by_name(self):
+        """Test ordering courses by name."""
+        create_course(author=self.teacher, name="B")
+        create_course(author=self.teacher, name="A")
+        create_course(author=self.teacher, name="C")
+
+        res = self.client.get(COURSES_URL, {"ordering": "name"})
+        self.assertEqual([course["name"] for course in res.data], ["A", "B", "C"])
+        res = self.client.get(COURSES_URL, {"ordering": "-name"})
+        self.assertEqual([course["name"] for course in res.data], ["C", "B", "A"])
+
+    def test_expand_author(self):
+        """Test author names are expanded without a query per course."""
+        other_teacher = create_teacher(user=create_user(email="user2@example.com"))
+        create_course(author=self.teacher)
+        create_course(author=other_teacher)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(COURSES_URL, {"expand": "author"})
+
+        self.assertEqual(
+            res.data[1]["author"],
+            {"id": self.teacher.id, "first_name": "First", "last_name": "Last"},
+        )
+        self.user.first_name = "Renamed"
+        self.user.save()
+        res = self.client.get(COURSES_URL, {"expand": "author"})
+        self.assertEqual(res.data[1]["author"]["first_name"], "Renamed")
+
+    def test_invalid_filters(self):
+        """Test invalid query parameters are rejected."""
+        for params in [
+            {"author": "someone"},
+            {"modified_after": "yesterday"},
+            {"ordering": "description"},
+        ]:
+            res = self.client.get(COURSES_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_catalog_served_from_cache(self):
+        """Test catalog reads are cached until a course changes."""
+        course = create_course(author=self.teacher)
+        detail_url = reverse("course:course-detail", args=[course.id])
+        self.client.get(COURSES_URL)
+        self.client.get(detail_url)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(COURSES_URL)
+        self.assertEqual(res.data[0]["name"], "Course Foo")
+        with self.assertNumQueries(0):
+            res = self.client.get(detail_url)
+        self.assertEqual(res.data["name"], "Course Foo")
+
+        course.name = "Course Bar"
+        course.save()
+
+        self.assertEqual(self.client.get(COURSES_URL).data[0]["name"], "Course Bar")
+        self.assertEqual(self.client.get(detail_url).data["name"], "Course Bar")
+        course.delete()
+        self.assertEqual(self.client.get(COURSES_URL).data, [])
+
+    def test_catalog_cache_ignores_parameter_order(self):
+        """Test the same parameters in another order share a cached response."""
+        create_course(author=self.teacher)
+        self.client.get(COURSES_URL, {"ordering": "name", "expand": "author"})
+
+        with self.assertNumQueries(0):
+            res = self.client.get(f"{COURSES_URL}?expand=author&ordering=name")
+
+        self.assertEqual(len(res.data), 1)
+
+    def test_author_me_cached_per_teacher(self):
+        """Test teachers listing their own courses do not share a response."""
+        own = create_course(author=self.teacher, name="Own Course")
+        other_teacher = create_teacher(user=create_user(email="user2@example.com"))
+        other = create_course(author=other_teacher, name="Other Course")
+        other_client = APIClient()
+        other_client.force_authenticate(other_teacher.user)
+
+        for params in [{"author": "me"}, {"author": "me", "q": "Course"}]:
+            res = self.client.get(COURSES_URL, params)
+            self.assertEqual([course["id"] for course in res.data], [own.id])
+
+            res = other_client.get(COURSES_URL, params)
+            self.assertEqual([course["id"] for course in res.data], [other.id])
+
+    def test_token_identity_single_query(self):
+        """Test a cached catalog read with a token only queries the identity."""
+        create_course(author=self.teacher)
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        client.get(COURSES_URL)
+
+        with self.assertNumQueries(1):
+            res = client.get(COURSES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+
     def test_teacher_can_create_course(self):
         """Ensure teacher can create a course."""
         payload = {"name": "New Course", "description": "New Course Description"}
@@ -2,49 +2,140 @@
 Views for the courses APIs.
 """
 
-from rest_framework import viewsets
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework import status, viewsets
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
 
-from core.models import Course, Teacher
+from core.catalog import get_cached_catalog, set_cached_catalog
+from core.models import Course
+from core.roles import TEACHER, ProfileJWTAuthentication, RoleMixin
+from core.search import search_courses
 from course import serializers
 
+# Course list query parameters and the lookups they filter on.
+COURSE_FILTERS = {
+    "author": "author_id",
+    "created_after": "created__gte",
+    "created_before": "created__lt",
+    "modified_after": "modified__gte",
+    "modified_before": "modified__lt",
+}
 
-class CourseViewSet(viewsets.ModelViewSet):
+
+class CourseViewSet(RoleMixin, viewsets.ModelViewSet):
     """View for manage course API."""
 
     serializer_class = serializers.CourseSerializer
     queryset = Course.objects.all()
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ProfileJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
-    def get_queryset(self):
-        """Retrieve all courses"""
-        try:
-            Teacher.objects.get(user=self.request.user)
-            return self.queryset.order_by("-id")
-        except Teacher.DoesNotExist:
+    def check_teacher(self):
+        if self.request.role != TEACHER:
             raise PermissionDenied(
                 "\
                 Access denied: Only teachers can access this view.\
                 "
             )
 
+    def get_queryset(self):
+        """Retrieve all courses"""
+        self.check_teacher()
+        return self.queryset.order_by("-id")
+
+    def get_filters(self):
+        """Return the validated filter, ordering and expansion parameters."""
+        if not hasattr(self, "_filters"):
+            serializer = serializers.CourseFilterSerializer(
+                data=self.request.query_params, context={"request": self.request}
+            )
+            serializer.is_valid(raise_exception=True)
+            self._filters = serializer.validated_data
+        return self._filters
+
+    def filter_queryset(self, queryset):
+        """Apply the filters and ordering of the query parameters."""
+        filters = self.get_filters()
+        for name, lookup in COURSE_FILTERS.items():
+            if name in filters:
+                queryset = queryset.filter(**{lookup: filters[name]})
+        if "ordering" in filters:
+            queryset = queryset.order_by(
+                *serializers.COURSE_ORDERINGS[filters["ordering"]]
+            )
+        if filters.get("expand") == "author":
+            queryset = queryset.select_related("author__user")
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.request.method == "GET":
+            context["expand"] = {self.get_filters().get("expand")}
+        return context
+
+    def catalog_request_key(self, request, **kwargs):
+        """
+        Return the key of a catalog read in the shared cache, see
+        `core.catalog` for what it must hold.
+        """
+        params = {
+            key: sorted(values) for key, values in request.query_params.lists()
+        }
+        filters = self.get_filters()
+        if "author" in filters:
+            # `me` differs per teacher, key on the teacher it resolves to.
+            params["author"] = filters["author"]
+        return {"action": self.action, "kwargs": kwargs, "params": params}
+
+    def cached_response(self, render, request, *args, **kwargs):
+        """
+        Return the response of a catalog read from the shared cache, or
+        render it and cache it for the current catalog version.
+
+        Every teacher may read every course, `get_object` only restricts
+        writes to the author, so teachers share the cached lists and
+        details. Reads that depend on who asks need their own key.
+        """
+        self.check_teacher()
+        request_key = self.catalog_request_key(request, **kwargs)
+        version, data = get_cached_catalog(request_key)
+        if data is not None:
+            return Response(data)
+        response = render(request, *args, **kwargs)
+        if version is not None and response.status_code == status.HTTP_200_OK:
+            set_cached_catalog(request_key, version, response.data)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """List the catalog, or the best courses matching a `q` search."""
+        return self.cached_response(self.render_list, request, *args, **kwargs)
+
+    def render_list(self, request, *args, **kwargs):
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return super().list(request, *args, **kwargs)
+
+        courses = search_courses(self.filter_queryset(self.get_queryset()), query)
+        serializer = serializers.CourseSearchSerializer(
+            courses, many=True, context=self.get_serializer_context()
+        )
+        return Response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
     def get_object(self):
         """Retrieve and return the course, ensuring only the author can update or delete."""
         obj = super().get_object()
-        teacher = Teacher.objects.get(user=self.request.user)
         if self.request.method in ["PUT", "PATCH", "DELETE"]:
-            if obj.author != teacher:
+            if obj.author_id != self.request.profile.id:
                 raise PermissionDenied(
                     "You can only update or delete your own courses."
                 )
         return obj
 
     def perform_create(self, serializer):
-        try:
-            teacher = Teacher.objects.get(user=self.request.user)
-            serializer.save(author=teacher)
-        except Teacher.DoesNotExist:
+        if self.request.role != TEACHER:
             raise PermissionDenied("You must be a teacher to create a course.")
+        serializer.save(author=self.request.profile)